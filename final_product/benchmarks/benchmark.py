@@ -0,0 +1,305 @@
+# A module for timing every stage of making a dashboard, using saved data instead of downloading it.
+# Run with "python -m StockDashboardApplication.benchmarks.benchmark -o results.json"
+
+import argparse # Used for reading the command line arguments
+import json # Used for reading the statements and writing the results
+import os # Used for building file paths and finding the file size
+import platform # Used for recording the machine the benchmark ran on
+import statistics # Used for the median time of each stage
+import subprocess # Used for recording the version of the code
+import sys # Used for the exit code
+import tempfile # Used for saving the dashboards somewhere temporary
+import time # Used for timing each stage
+import tracemalloc # Used for finding the peak memory
+from contextlib import contextmanager # Used for timing the stages only while a case runs
+
+import numpy as np # Used for creating the synthetic prices
+import openpyxl # Used for recording its version
+import pandas as pd # Used for reading and writing the saved prices
+
+from StockDashboardApplication.program_code import dashboard
+from StockDashboardApplication.program_code.parallel_sheets import get_sheet_pool
+from StockDashboardApplication.program_code.main import API_KEY, get_date_range, parse_stock_data
+
+# Where the saved prices and statements are kept
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Years of history in each synthetic case
+SYNTHETIC_YEARS = (1, 5, 10, 30)
+
+# Last day of every synthetic history, so results can be compared between runs
+SYNTHETIC_END = '2021-06-30'
+
+# Functions in dashboard.py that are timed, by stage (each stage's time does not include the stages it calls)
+STAGES = (
+    ('model', ('build_model',)),
+    ('create_dashboard', ('create_dashboard',)),
+    ('charts', ('standard_stock_graph', 'open_high_low_close_graph', 'ratio_history_graph', 'summary_graph')),
+    ('save', ('save_workbook',))
+)
+
+# Columns of each synthetic statement, besides fiscalDateEnding and reportedCurrency (the same as alpha vantage's)
+INCOME_STATEMENT_COLUMNS = (
+    'grossProfit', 'totalRevenue', 'costOfRevenue', 'costofGoodsAndServicesSold', 'operatingIncome',
+    'sellingGeneralAndAdministrative', 'researchAndDevelopment', 'operatingExpenses', 'investmentIncomeNet',
+    'netInterestIncome', 'interestIncome', 'interestExpense', 'nonInterestIncome', 'otherNonOperatingIncome',
+    'depreciation', 'depreciationAndAmortization', 'incomeBeforeTax', 'incomeTaxExpense', 'interestAndDebtExpense',
+    'netIncomeFromContinuingOperations', 'comprehensiveIncomeNetOfTax', 'ebit', 'ebitda', 'netIncome'
+)
+BALANCE_SHEET_COLUMNS = (
+    'totalAssets', 'totalCurrentAssets', 'cashAndCashEquivalentsAtCarryingValue', 'cashAndShortTermInvestments',
+    'inventory', 'currentNetReceivables', 'totalNonCurrentAssets', 'propertyPlantEquipment',
+    'accumulatedDepreciationAmortizationPPE', 'intangibleAssets', 'intangibleAssetsExcludingGoodwill', 'goodwill',
+    'investments', 'longTermInvestments', 'shortTermInvestments', 'otherCurrentAssets', 'otherNonCurrentAssets',
+    'totalLiabilities', 'totalCurrentLiabilities', 'currentAccountsPayable', 'deferredRevenue', 'currentDebt',
+    'shortTermDebt', 'totalNonCurrentLiabilities', 'capitalLeaseObligations', 'longTermDebt', 'currentLongTermDebt',
+    'longTermDebtNoncurrent', 'shortLongTermDebtTotal', 'otherCurrentLiabilities', 'otherNonCurrentLiabilities',
+    'totalShareholderEquity', 'treasuryStock', 'retainedEarnings', 'commonStock', 'commonStockSharesOutstanding'
+)
+
+# Adds up the time spent in each stage, not counting the time spent in the stages it calls
+class StageTimer:
+    # Constructor
+    def __init__(self):
+        self.times = {}
+        self.nested = [] # Time spent in the stages called by each stage currently running
+
+    # Wraps a function so every call to it is added to a stage
+    def wrap(self, stage, function):
+        def timed(*args, **kwargs):
+            self.nested.append(0.0)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                self.times[stage] = self.times.get(stage, 0.0) + elapsed - self.nested.pop()
+                if len(self.nested) > 0:
+                    self.nested[-1] += elapsed
+        return timed
+
+# Times the functions in STAGES while the case runs, putting the original functions back afterwards
+@contextmanager
+def timed_stages(timer):
+    originals = {}
+    for stage, names in STAGES:
+        for name in names:
+            originals[name] = getattr(dashboard, name)
+            setattr(dashboard, name, timer.wrap(stage, originals[name]))
+    try:
+        yield timer
+    finally:
+        for name, function in originals.items():
+            setattr(dashboard, name, function)
+
+# Creates one synthetic statement of a number of reports, newest first, with the values as text like alpha vantage
+def make_reports(rng, columns, end_date, count, months_apart):
+    reports = []
+    size = 10 ** 9
+    for i in range(count):
+        report = {'fiscalDateEnding': (end_date - pd.DateOffset(months=months_apart * i)).strftime('%Y-%m-%d'),
+                  'reportedCurrency': 'USD'}
+        for column in columns:
+            # A few values are missing, like in real statements
+            if rng.random() < 0.05:
+                report[column] = 'None'
+            else:
+                report[column] = str(int(size * rng.uniform(0.1, 1.0)))
+        reports.append(report)
+    return reports
+
+# Creates the prices and statements of a made-up company with a number of years of history
+def make_synthetic_fixture(fixtures_dir, years):
+    name = f'synthetic_{years}y'
+    rng = np.random.default_rng(years)
+    end_date = pd.Timestamp(SYNTHETIC_END)
+
+    # A random walk of the closing price, with the open, high and low around it
+    dates = pd.bdate_range(end_date - pd.DateOffset(years=years), end_date, name='Date')
+    rows = len(dates)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, rows)))
+    open_price = close * (1 + rng.normal(0, 0.005, rows))
+    high = np.maximum(open_price, close) * (1 + np.abs(rng.normal(0, 0.01, rows)))
+    low = np.minimum(open_price, close) * (1 - np.abs(rng.normal(0, 0.01, rows)))
+    volume = rng.integers(1000000, 100000000, rows)
+    prices = pd.DataFrame({'High': high, 'Low': low, 'Open': open_price, 'Close': close, 'Volume': volume,
+                           'Adj Close': close}, index=dates)
+    prices.to_csv(os.path.join(fixtures_dir, f'{name}_prices.csv'))
+
+    quarters = max(4, 4 * years)
+    annual = max(2, years)
+    for statement_name, columns in (('income_statement', INCOME_STATEMENT_COLUMNS), ('balance_sheet', BALANCE_SHEET_COLUMNS)):
+        data = {'symbol': name.upper(),
+                'annualReports': make_reports(rng, columns, end_date, annual, 12),
+                'quarterlyReports': make_reports(rng, columns, end_date, quarters, 3)}
+        with open(os.path.join(fixtures_dir, f'{name}_{statement_name}.json'), 'w') as f:
+            json.dump(data, f)
+    return name
+
+# Downloads a ticker symbol's prices and statements and saves them, so they can be benchmarked offline later
+def record_fixture(fixtures_dir, ticker_symbol, days):
+    from StockDashboardApplication.program_code.data_sources import fetch_all
+
+    name = f'{ticker_symbol.upper()}_{days}d'
+    start_date, end_date = get_date_range(days)
+    prices, is_data, bs_data = fetch_all(ticker_symbol.upper(), start_date, end_date, API_KEY, use_cache=False)
+    prices.rename_axis(None, axis=1).to_csv(os.path.join(fixtures_dir, f'{name}_prices.csv'))
+    for statement_name, data in (('income_statement', is_data), ('balance_sheet', bs_data)):
+        with open(os.path.join(fixtures_dir, f'{name}_{statement_name}.json'), 'w') as f:
+            json.dump(data, f)
+    return name
+
+# Finds the names of every saved set of prices and statements
+def find_fixtures(fixtures_dir):
+    names = []
+    for file_name in sorted(os.listdir(fixtures_dir)):
+        if file_name.endswith('_prices.csv'):
+            name = file_name[:-len('_prices.csv')]
+            if all(os.path.exists(os.path.join(fixtures_dir, f'{name}_{s}.json')) for s in ('income_statement', 'balance_sheet')):
+                names.append(name)
+    return names
+
+# Reads a saved set of prices and statements in the same form they are downloaded in
+def load_fixture(fixtures_dir, name):
+    prices = pd.read_csv(os.path.join(fixtures_dir, f'{name}_prices.csv'), index_col='Date', parse_dates=['Date'])
+    with open(os.path.join(fixtures_dir, f'{name}_income_statement.json')) as f:
+        is_data = json.load(f)
+    with open(os.path.join(fixtures_dir, f'{name}_balance_sheet.json')) as f:
+        bs_data = json.load(f)
+    return (prices, is_data, bs_data)
+
+# Makes one dashboard from a saved set of data, returning the time of each stage and the file created
+def run_once(raw_data, ticker_symbol, output_dir, sheet_pool=None):
+    timer = StageTimer()
+    path = os.path.join(output_dir, f'{ticker_symbol}_Stock_Dashboard.xlsx')
+    with timed_stages(timer):
+        start = time.perf_counter()
+        all_dataframes = timer.wrap('parse', parse_stock_data)(*raw_data)
+        timer.wrap('add_pivot_tables', dashboard.add_pivot_tables)(ticker_symbol, all_dataframes,
+                                                                   (path, os.path.basename(path)),
+                                                                   sheet_pool=sheet_pool)
+        timer.times['total'] = time.perf_counter() - start
+    return (timer.times, path)
+
+# Benchmarks one saved set of data: the median time of each stage, the peak memory and the file size
+def run_case(fixtures_dir, name, repeat, output_dir, sheet_pool=None):
+    start = time.perf_counter()
+    raw_data = load_fixture(fixtures_dir, name)
+    load_time = time.perf_counter() - start
+
+    all_times = []
+    for i in range(repeat):
+        times, path = run_once(raw_data, name.upper(), output_dir, sheet_pool)
+        all_times.append(times)
+
+    # Memory is measured on its own run, since tracing every allocation slows everything down
+    tracemalloc.start()
+    run_once(raw_data, name.upper(), output_dir, sheet_pool)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    stages = {'load_fixture': load_time}
+    for stage in all_times[0]:
+        stages[stage] = statistics.median(times[stage] for times in all_times)
+
+    return {
+        'name': name,
+        'price_rows': int(raw_data[0].shape[0]),
+        'quarterly_reports': len(raw_data[1]['quarterlyReports']),
+        'seconds': stages,
+        'peak_memory_bytes': peak_memory,
+        'file_size_bytes': os.path.getsize(path)
+    }
+
+# Gets the commit the benchmark ran on, if the code is in a git repository
+def get_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except:
+        return None
+
+# Runs every case, returning the results with a description of where they ran
+def run_benchmarks(fixtures_dir, names, repeat=3, sheet_pool=None):
+    results = {
+        'commit': get_commit(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pandas': pd.__version__,
+        'openpyxl': openpyxl.__version__,
+        'repeat': repeat,
+        'parallel_sheets': sheet_pool is not None,
+        'cases': []
+    }
+    with tempfile.TemporaryDirectory() as output_dir:
+        for name in names:
+            results['cases'].append(run_case(fixtures_dir, name, repeat, output_dir, sheet_pool))
+    return results
+
+# Prints each case's results, and how much they changed from an earlier run if one is given
+def print_results(results, previous=None, threshold=10.0):
+    previous_cases = {} if previous is None else {case['name']: case for case in previous['cases']}
+    regressions = 0
+    for case in results['cases']:
+        print(f"{case['name']} ({case['price_rows']} days, {case['quarterly_reports']} quarters): "
+              f"peak memory {case['peak_memory_bytes'] / 2 ** 20:.1f} MiB, file size {case['file_size_bytes'] / 1024:.0f} KiB")
+        old_case = previous_cases.get(case['name'])
+        for stage, seconds in case['seconds'].items():
+            line = f'    {stage:<20}{seconds * 1000:>10.1f} ms'
+            if old_case is not None and old_case['seconds'].get(stage):
+                change = (seconds / old_case['seconds'][stage] - 1) * 100
+                line += f'  ({change:+.0f}%)'
+                if change > threshold and stage != 'load_fixture':
+                    line += '  SLOWER'
+                    regressions += 1
+            print(line)
+    return regressions
+
+# Reads the command line arguments and runs the benchmarks
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Time each stage of making a dashboard from saved data.')
+    parser.add_argument('-o', '--output', help='file the results are written to as JSon')
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help='folder holding the saved prices and statements')
+    parser.add_argument('--years', type=int, nargs='*', default=list(SYNTHETIC_YEARS),
+                        help='years of history in each synthetic case')
+    parser.add_argument('--repeat', type=int, default=3, help='number of times each case is timed')
+    parser.add_argument('--compare', help='results of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=10.0, help='percent slower that counts as a regression')
+    parser.add_argument('--record', metavar='TICKER', help='download and save a ticker symbol\'s data, then exit')
+    parser.add_argument('--days', type=int, default=365, help='days of prices to download with --record')
+    parser.add_argument('--parallel-sheets', action='store_true',
+                        help='write the tables of long histories in worker processes (see parallel_sheets.py)')
+    parser.add_argument('--sheet-workers', type=int, default=None, help='number of processes writing the tables')
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.fixtures, exist_ok=True)
+    if args.record is not None:
+        print(f'Saved {record_fixture(args.fixtures, args.record, args.days)} to {args.fixtures}')
+        return 0
+
+    # Synthetic cases are created the first time they are needed; recorded ones are used as they are
+    for years in args.years:
+        if not os.path.exists(os.path.join(args.fixtures, f'synthetic_{years}y_prices.csv')):
+            make_synthetic_fixture(args.fixtures, years)
+    synthetic_names = [f'synthetic_{years}y' for years in args.years]
+    names = synthetic_names + [name for name in find_fixtures(args.fixtures) if not name.startswith('synthetic_')]
+
+    sheet_pool = get_sheet_pool(args.sheet_workers) if args.parallel_sheets else None
+    results = run_benchmarks(args.fixtures, names, args.repeat, sheet_pool)
+
+    previous = None
+    if args.compare is not None:
+        with open(args.compare) as f:
+            previous = json.load(f)
+    regressions = print_results(results, previous, args.threshold)
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    # Non-zero exit code if any stage got slower than the threshold
+    return 0 if regressions == 0 else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
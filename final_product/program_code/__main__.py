@@ -0,0 +1,5 @@
+# Runs the program with "python -m StockDashboardApplication.program_code"
+
+from StockDashboardApplication.program_code.main import run
+
+run()
@@ -0,0 +1,65 @@
+# A module for summarizing the daily prices by week, month, quarter and year
+
+import numpy as np # Used for the group keys
+import pandas as pd # Used for grouping the prices
+
+from StockDashboardApplication.program_code.profiling import profiled
+
+# Columns of every summary table, in order
+SUMMARY_COLUMNS = ('Period', 'Start', 'End', 'Open', 'High', 'Low', 'Close', 'Volume', 'VWAP', 'Range')
+
+# How each column is combined when days (or smaller periods) are grouped together
+AGGREGATIONS = {'Start': 'first', 'End': 'last', 'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last',
+                'Volume': 'sum', 'PriceVolume': 'sum'}
+
+# Adds the volume-weighted average price and range, and labels each period
+def finish_summary(table, labels):
+    table = table.reset_index(drop=True)
+    table.insert(0, 'Period', labels.values)
+
+    # Daily bars have no intraday prices, so each day's typical price ((high + low + close) / 3) is weighted
+    table['VWAP'] = table['PriceVolume'] / table['Volume'].replace(0, np.nan)
+    table['Range'] = table['High'] - table['Low']
+    return table.reindex(columns=list(SUMMARY_COLUMNS))
+
+# Creates the weekly, monthly, quarterly and yearly summaries of the prices.
+# The daily prices are only grouped once, into pieces of weeks that fall within a single month; weeks and
+# months are combined from those pieces, and quarters and years from the months.
+@profiled('calendar_rollups')
+def calendar_rollups(df):
+    dates = df['Date']
+    iso = dates.dt.isocalendar()
+    days = pd.DataFrame({
+        'week': iso['year'].values.astype(np.int64) * 100 + iso['week'].values.astype(np.int64),
+        'month': dates.dt.year.values.astype(np.int64) * 100 + dates.dt.month.values.astype(np.int64),
+        'Start': dates.values,
+        'End': dates.values,
+        'Open': df['Open'].values,
+        'High': df['High'].values,
+        'Low': df['Low'].values,
+        'Close': df['Close'].values,
+        'Volume': df['Volume'].values,
+        'PriceVolume': ((df['High'] + df['Low'] + df['Close']) / 3 * df['Volume']).values
+    })
+
+    # The only pass over every day
+    pieces = days.groupby(['month', 'week'], sort=True).agg(AGGREGATIONS).reset_index()
+
+    weeks = pieces.groupby('week', sort=True).agg(AGGREGATIONS)
+    months = pieces.groupby('month', sort=True).agg(AGGREGATIONS)
+
+    month_keys = months.index.values
+    quarters = months.groupby(month_keys // 100 * 10 + (month_keys % 100 - 1) // 3 + 1, sort=True).agg(AGGREGATIONS)
+    years = months.groupby(month_keys // 100, sort=True).agg(AGGREGATIONS)
+
+    # Labels such as 2021-W05, 2021-02, 2021Q1 and 2021
+    week_keys = weeks.index.to_series().astype(str)
+    month_keys = months.index.to_series().astype(str)
+    quarter_keys = quarters.index.to_series().astype(str)
+
+    return {
+        'Weekly': finish_summary(weeks, week_keys.str[:4] + '-W' + week_keys.str[4:]),
+        'Monthly': finish_summary(months, month_keys.str[:4] + '-' + month_keys.str[4:]),
+        'Quarterly': finish_summary(quarters, quarter_keys.str[:4] + 'Q' + quarter_keys.str[4:]),
+        'Yearly': finish_summary(years, years.index.to_series().astype(str))
+    }
@@ -0,0 +1,147 @@
+# A module for creating the dashboards of many ticker symbols at once, without any prompts
+
+import argparse # Used for reading the command line arguments
+import os # Used for finding the number of processors and building file paths
+import sys # Used for the exit code
+import time # Used for timing each ticker symbol
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed # Used for running in parallel
+
+from StockDashboardApplication.program_code.main import API_KEY, get_date_range, fetch_stock_data
+from StockDashboardApplication.program_code.providers import make_provider
+from StockDashboardApplication.program_code.dashboard import add_pivot_tables
+from StockDashboardApplication.program_code.dashboard_cache import DashboardCache
+from StockDashboardApplication.program_code.profiling import profiling, add_profile_arguments, make_profiler, \
+    PROFILE_LOG
+
+# Number of ticker symbols whose data is downloaded at the same time
+FETCH_THREADS = 8
+
+# Reads the ticker symbols from the command line and/ or a file (one symbol per line, '#' starts a comment)
+def read_tickers(tickers, ticker_file=None):
+    all_tickers = [t.upper() for t in tickers]
+    if ticker_file is not None:
+        with open(ticker_file) as f:
+            for line in f:
+                ticker_symbol = line.split('#')[0].strip().upper()
+                if ticker_symbol != '':
+                    all_tickers.append(ticker_symbol)
+
+    # Remove duplicates while keeping the original order
+    return list(dict.fromkeys(all_tickers))
+
+# Downloads the data for one ticker symbol, timing how long it took
+def fetch_ticker(ticker_symbol, start_date, end_date, use_cache=True, profiler=None, provider=None):
+    start_time = time.perf_counter()
+    with profiling(profiler):
+        all_dataframes = fetch_stock_data(ticker_symbol, start_date, end_date, use_cache, provider)
+    return (all_dataframes, time.perf_counter() - start_time)
+
+# Creates the excel file for one ticker symbol (runs inside a worker process), timing how long it took.
+# The profiler is a copy in the worker process, so it is sent back with the results.
+def render_ticker(ticker_symbol, all_dataframes, output_dir, profiler=None, dashboard_cache=None):
+    start_time = time.perf_counter()
+    file_name = f'{ticker_symbol}_Stock_Dashboard.xlsx'
+    with profiling(profiler):
+        if dashboard_cache is None:
+            path = add_pivot_tables(ticker_symbol, all_dataframes, (os.path.join(output_dir, file_name), file_name))
+        else:
+            # A dashboard whose data has not changed is copied from the cache instead of being created again
+            path = os.path.join(output_dir, file_name)
+            content = dashboard_cache.get_dashboard(ticker_symbol, all_dataframes)[0]
+            with open(path, 'wb') as f:
+                f.write(content)
+    return (path, time.perf_counter() - start_time, profiler)
+
+# Creates a dashboard for every ticker symbol, returning a dictionary of results for each one
+def run_batch(tickers, output_dir, days=365, workers=None, use_cache=True, profile_args=None, provider=None,
+              dashboard_cache=None):
+    start_date, end_date = get_date_range(days)
+    os.makedirs(output_dir, exist_ok=True)
+
+    # One profiler per ticker symbol when profiling is turned on
+    profilers = {t: None if profile_args is None else make_profiler(t, profile_args, output_dir) for t in tickers}
+
+    results = {ticker_symbol: {'status': 'FAILED', 'fetch_time': None, 'render_time': None, 'path': None, 'error': None}
+               for ticker_symbol in tickers}
+
+    # Network downloads run on threads, the excel files are created on one process per processor
+    with ThreadPoolExecutor(max_workers=FETCH_THREADS) as fetch_pool, \
+            ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as render_pool:
+        fetch_futures = {fetch_pool.submit(fetch_ticker, t, start_date, end_date, use_cache, profilers[t], provider): t
+                         for t in tickers}
+        render_futures = {}
+
+        # Start creating each excel file as soon as its data arrives
+        for future in as_completed(fetch_futures):
+            ticker_symbol = fetch_futures[future]
+            try:
+                all_dataframes, results[ticker_symbol]['fetch_time'] = future.result()
+            except Exception as e:
+                results[ticker_symbol]['error'] = f'Could not retrieve data ({e!r})'
+                continue
+            render_futures[render_pool.submit(render_ticker, ticker_symbol, all_dataframes, output_dir,
+                                              profilers[ticker_symbol], dashboard_cache)] = ticker_symbol
+
+        for future in as_completed(render_futures):
+            ticker_symbol = render_futures[future]
+            try:
+                results[ticker_symbol]['path'], results[ticker_symbol]['render_time'], profiler = future.result()
+                results[ticker_symbol]['status'] = 'OK'
+                if profiler is not None:
+                    profilers[ticker_symbol] = profiler
+            except Exception as e:
+                results[ticker_symbol]['error'] = f'Could not create dashboard ({e!r})'
+
+    # Add every ticker symbol's record to the log in the output directory
+    for ticker_symbol, profiler in profilers.items():
+        if profiler is not None:
+            profiler.write_record(os.path.join(output_dir, PROFILE_LOG))
+            results[ticker_symbol]['profile'] = profiler.record()
+
+    return results
+
+# Prints the outcome and timings of every ticker symbol
+def print_report(results, total_time):
+    print(f'{"Ticker":<10}{"Status":<8}{"Fetch":>10}{"Render":>10}  Details')
+    for ticker_symbol, result in results.items():
+        fetch_time = '-' if result['fetch_time'] is None else f'{result["fetch_time"]:.2f}s'
+        render_time = '-' if result['render_time'] is None else f'{result["render_time"]:.2f}s'
+        details = result['path'] if result['status'] == 'OK' else result['error']
+        print(f'{ticker_symbol:<10}{result["status"]:<8}{fetch_time:>10}{render_time:>10}  {details}')
+
+    succeeded = sum(1 for result in results.values() if result['status'] == 'OK')
+    print(f'\n{succeeded} of {len(results)} dashboards created in {total_time:.2f}s.')
+
+# Reads the command line arguments and runs the batch
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Create stock dashboards for many ticker symbols at once.')
+    parser.add_argument('tickers', nargs='*', help='ticker symbols to create dashboards for')
+    parser.add_argument('-f', '--file', help='file with one ticker symbol per line')
+    parser.add_argument('-o', '--output', default='.', help='directory the dashboards are saved in')
+    parser.add_argument('--days', type=int, default=365, help='number of days of stock prices to include')
+    parser.add_argument('--workers', type=int, default=None, help='number of processes creating excel files')
+    parser.add_argument('--no-cache', action='store_true', help='download all data again instead of using the cache')
+    parser.add_argument('--store', help='read the prices from this local store instead of downloading them')
+    parser.add_argument('--no-dashboard-cache', action='store_true',
+                        help='create every dashboard again, even if its data has not changed')
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    tickers = read_tickers(args.tickers, args.file)
+    if len(tickers) == 0:
+        parser.error('no ticker symbols given')
+
+    start_time = time.perf_counter()
+    results = run_batch(tickers, args.output, args.days, args.workers, not args.no_cache, args,
+                        make_provider(API_KEY, args.store), None if args.no_dashboard_cache else DashboardCache())
+    print_report(results, time.perf_counter() - start_time)
+    if any('profile' in result for result in results.values()):
+        print(f'Profiles added to {os.path.join(args.output, PROFILE_LOG)}')
+
+    # Non-zero exit code if any dashboard could not be created
+    return 0 if all(result['status'] == 'OK' for result in results.values()) else 1
+
+if __name__ == '__main__':
+    # Run through the imported module so the worker processes can find render_ticker
+    from StockDashboardApplication.program_code import batch
+    sys.exit(batch.main())
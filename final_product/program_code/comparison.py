@@ -0,0 +1,231 @@
+# A module for comparing many ticker symbols in one workbook: their performance since the first day, how their
+# daily returns are correlated and their beta against a benchmark.
+# Run with "python -m StockDashboardApplication.program_code.comparison AAPL MSFT GOOG --benchmark SPY"
+
+import argparse # Used for reading the command line arguments
+import os # Used for building file paths
+import sys # Used for the exit code
+from concurrent.futures import ThreadPoolExecutor, as_completed # Used for downloading the prices at the same time
+
+import numpy as np # Used for calculating every pair of ticker symbols at once
+import pandas as pd # Used for lining up the prices by date
+import openpyxl # Used for creating the workbook
+from openpyxl.formatting.rule import ColorScaleRule # Used for coloring the correlations like a heatmap
+from openpyxl.utils import get_column_letter # Used for finding the range of the correlations
+
+from StockDashboardApplication.program_code.main import API_KEY, get_date_range
+from StockDashboardApplication.program_code.providers import make_provider
+from StockDashboardApplication.program_code.batch import read_tickers, FETCH_THREADS
+from StockDashboardApplication.program_code.dashboard import make_pivot_table, save_workbook, CELL_WIDTH, CELL_HEIGHT, \
+    INFO_BG_COLOR
+from StockDashboardApplication.program_code.graphs import ratio_history_graph
+from StockDashboardApplication.program_code.downsampling import MAX_LINE_POINTS
+from StockDashboardApplication.program_code.indicators import TRADING_DAYS
+from StockDashboardApplication.program_code.profiling import profiled
+
+# Ticker symbol every other one is compared against, unless another is chosen
+DEFAULT_BENCHMARK = 'SPY'
+
+# Fewest days two ticker symbols must both have returns on for their correlation (or beta) to be calculated
+MIN_OVERLAP = 20
+
+# Colors of the correlations from -1 (red) through 0 (white) to 1 (green)
+HEATMAP_COLORS = ('F8696B', 'FFFFFF', '63BE7B')
+
+# Gets the closing prices of every ticker symbol at the same time, lined up by date (missing days are NaN).
+# Returns the prices and a dictionary of the ticker symbols that could not be retrieved, with their errors.
+@profiled('fetch_closes')
+def fetch_closes(provider, tickers, start_date, end_date, use_cache=True):
+    closes = {}
+    errors = {}
+    with ThreadPoolExecutor(max_workers=FETCH_THREADS) as pool:
+        futures = {pool.submit(provider.get_prices, t, start_date, end_date, use_cache): t for t in tickers}
+        for future in as_completed(futures):
+            ticker_symbol = futures[future]
+            try:
+                prices = future.result()
+                # Adjusted prices include splits and dividends, so the returns can be compared fairly
+                column = 'Adj Close' if 'Adj Close' in prices else 'Close'
+                closes[ticker_symbol] = prices[column].astype(np.float64)
+            except Exception as e:
+                errors[ticker_symbol] = f'Could not retrieve data ({e!r})'
+
+    # Keep the order the ticker symbols were given in
+    ordered = [t for t in tickers if t in closes]
+    if len(ordered) == 0:
+        return (pd.DataFrame(), errors)
+    matrix = pd.concat([closes[t] for t in ordered], axis=1, keys=ordered).sort_index()
+    matrix.index = pd.DatetimeIndex(matrix.index).normalize()
+    return (matrix[~matrix.index.duplicated(keep='last')], errors)
+
+# Each ticker symbol's prices as a percentage of its first price (100 = where it started)
+def normalized_performance(closes):
+    values = closes.to_numpy(dtype=np.float64)
+    first_rows = np.argmax(~np.isnan(values), axis=0)
+    first_prices = values[first_rows, np.arange(values.shape[1])]
+    return pd.DataFrame(values / first_prices * 100, index=closes.index, columns=closes.columns)
+
+# Each day's return (NaN when either day's price is missing)
+def daily_returns(closes):
+    values = closes.to_numpy(dtype=np.float64)
+    returns = np.full(values.shape, np.nan)
+    returns[1:] = values[1:] / values[:-1] - 1
+    return returns
+
+# Correlation of every pair of columns of returns over the days both have returns.  Every pair is calculated at
+# once from a few matrix products, so 100 ticker symbols take no longer than a handful.
+def pairwise_correlation(returns, min_overlap=MIN_OVERLAP):
+    valid = (~np.isnan(returns)).astype(np.float64)
+    x = np.where(valid > 0, returns, 0.0)
+
+    # For each pair (i, j): the number of shared days, the sums of i's returns and squares on those days, and the
+    # sum of the products
+    counts = valid.T @ valid
+    sums = x.T @ valid
+    squares = (x ** 2).T @ valid
+    products = x.T @ x
+
+    covariance = counts * products - sums * sums.T
+    variance = counts * squares - sums ** 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        correlation = covariance / np.sqrt(variance * variance.T)
+    correlation[counts < min_overlap] = np.nan
+    return np.clip(correlation, -1, 1)
+
+# Beta of every column of returns against the benchmark's returns, over the days both have returns
+def betas(returns, benchmark_returns, min_overlap=MIN_OVERLAP):
+    valid = ~np.isnan(returns) & ~np.isnan(benchmark_returns)[:, None]
+    x = np.where(valid, returns, 0.0)
+    b = np.where(valid, benchmark_returns[:, None], 0.0)
+
+    counts = valid.sum(axis=0)
+    covariance = counts * (x * b).sum(axis=0) - x.sum(axis=0) * b.sum(axis=0)
+    variance = counts * (b ** 2).sum(axis=0) - b.sum(axis=0) ** 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        beta = covariance / variance
+    beta[counts < min_overlap] = np.nan
+    return beta
+
+# Calculates every comparison from the lined up closing prices.
+# Returns the summary table, the normalized performance table and the correlation matrix.
+@profiled('compare_tickers')
+def compare_tickers(closes, benchmark):
+    tickers = list(closes.columns)
+    performance = normalized_performance(closes)
+    returns = daily_returns(closes)
+    correlation = pairwise_correlation(returns)
+    benchmark_index = tickers.index(benchmark)
+
+    values = closes.to_numpy(dtype=np.float64)
+    valid = ~np.isnan(values)
+    first_rows = np.argmax(valid, axis=0)
+    last_rows = values.shape[0] - 1 - np.argmax(valid[::-1], axis=0)
+    columns = np.arange(values.shape[1])
+
+    summary = pd.DataFrame({
+        'Ticker': tickers,
+        'First Day': closes.index[first_rows],
+        'Last Day': closes.index[last_rows],
+        'Total Return (%)': (values[last_rows, columns] / values[first_rows, columns] - 1) * 100,
+        'Annualized Volatility (%)': np.nanstd(returns, axis=0, ddof=1) * np.sqrt(TRADING_DAYS) * 100,
+        f'Correlation with {benchmark}': correlation[:, benchmark_index],
+        f'Beta vs {benchmark}': betas(returns, returns[:, benchmark_index])
+    })
+
+    performance_table = performance.rename_axis('Date').reset_index()
+    return (summary, performance_table, correlation)
+
+# Keeps at most max_points evenly spaced rows of a table (always including the last), for a chart of many lines
+def thin_rows(table, max_points=MAX_LINE_POINTS):
+    if table.shape[0] <= max_points:
+        return table
+    rows = np.unique(np.linspace(0, table.shape[0] - 1, max_points).astype(np.int64))
+    return table.iloc[rows].reset_index(drop=True)
+
+# Writes the correlation matrix into its own sheet, colored from red (-1) to green (1)
+def add_correlation_sheet(wb, tickers, correlation):
+    ws = wb.create_sheet('Correlation')
+    ws.append(['Ticker'] + tickers)
+    rounded = np.round(correlation, 2)
+    for ticker_symbol, row in zip(tickers, rounded):
+        ws.append([ticker_symbol] + [None if np.isnan(value) else float(value) for value in row])
+
+    last_cell = f'{get_column_letter(len(tickers) + 1)}{len(tickers) + 1}'
+    ws.conditional_formatting.add(f'B2:{last_cell}', ColorScaleRule(
+        start_type='num', start_value=-1, start_color=HEATMAP_COLORS[0],
+        mid_type='num', mid_value=0, mid_color=HEATMAP_COLORS[1],
+        end_type='num', end_value=1, end_color=HEATMAP_COLORS[2]))
+
+# Creates the comparison workbook: a summary of every ticker symbol (with the performance chart), the
+# correlation heatmap and the normalized performance of every day
+@profiled('comparison_workbook')
+def make_comparison_workbook(closes, benchmark, excel_path):
+    summary, performance_table, correlation = compare_tickers(closes, benchmark)
+
+    wb = openpyxl.Workbook(write_only=True)
+    summary_entry = make_pivot_table(wb, summary, 'Summary', [str(di) for di in summary.columns.tolist()])
+    add_correlation_sheet(wb, list(closes.columns), correlation)
+    make_pivot_table(wb, performance_table, 'Normalized Performance',
+                     [str(di) for di in performance_table.columns.tolist()])
+
+    # The chart only needs enough days to show the shape of each line
+    chart_table = thin_rows(performance_table)
+    chart_entry = make_pivot_table(wb, chart_table, 'Performance Chart Table',
+                                   [str(di) for di in chart_table.columns.tolist()])
+    wb['Performance Chart Table'].sheet_state = 'hidden'
+
+    performance_chart = ratio_history_graph(wb, chart_entry, 'Normalized Performance (first day = 100)',
+                                            CELL_WIDTH * 14, CELL_HEIGHT * 28, INFO_BG_COLOR)
+    wb['Summary'].add_chart(performance_chart, anchor=f'{get_column_letter(summary_entry[2] + 2)}2')
+
+    return save_workbook(wb, excel_path)
+
+# Downloads the prices of every ticker symbol (and the benchmark) and saves the comparison workbook.
+# Returns the path it was saved to and the ticker symbols that could not be retrieved, with their errors.
+def build_comparison(tickers, output, days=365, benchmark=DEFAULT_BENCHMARK, use_cache=True, provider=None):
+    if provider is None:
+        provider = make_provider(API_KEY)
+
+    benchmark = benchmark.upper()
+    tickers = list(dict.fromkeys([t.upper() for t in tickers] + [benchmark]))
+    start_date, end_date = get_date_range(days)
+
+    closes, errors = fetch_closes(provider, tickers, start_date, end_date, use_cache)
+    if benchmark in errors:
+        raise ValueError(f"The benchmark '{benchmark}' could not be retrieved.  {errors[benchmark]}")
+
+    path = make_comparison_workbook(closes, benchmark, (output, os.path.basename(output)))
+    return (path, errors)
+
+# Reads the command line arguments and creates the comparison workbook
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare the performance and correlation of many ticker symbols.')
+    parser.add_argument('tickers', nargs='*', help='ticker symbols to compare')
+    parser.add_argument('-f', '--file', help='file with one ticker symbol per line')
+    parser.add_argument('-o', '--output', default='Stock_Comparison.xlsx', help='path the workbook is saved to')
+    parser.add_argument('--benchmark', default=DEFAULT_BENCHMARK, help='ticker symbol the betas are calculated against')
+    parser.add_argument('--days', type=int, default=365, help='number of days of stock prices to compare')
+    parser.add_argument('--no-cache', action='store_true', help='download all data again instead of using the cache')
+    parser.add_argument('--store', help='read the prices from this local store instead of downloading them')
+    args = parser.parse_args(argv)
+
+    tickers = read_tickers(args.tickers, args.file)
+    if len(tickers) == 0:
+        parser.error('no ticker symbols given')
+
+    try:
+        path, errors = build_comparison(tickers, args.output, args.days, args.benchmark, not args.no_cache,
+                                        make_provider(API_KEY, args.store))
+    except ValueError as e:
+        print(e)
+        return 1
+
+    for ticker_symbol, error in errors.items():
+        print(f"Left out '{ticker_symbol}': {error}")
+    print(f'Saved the comparison to {path}.')
+
+    # Non-zero exit code if any ticker symbol was left out
+    return 0 if len(errors) == 0 else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
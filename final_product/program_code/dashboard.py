@@ -0,0 +1,476 @@
+# A module for building the excel dashboard: the data tables, the dashboard sheet and the summary sheets
+
+import warnings # Used for ignoring the streamed table warnings
+
+import io # Used for creating the workbook in memory
+import os # Used for checking the user's path
+from copy import copy # Used for copying the styles of the dashboard's cells
+
+import openpyxl # Used for creating the dashboard
+from openpyxl.styles import Font, PatternFill # Used for changing the font of a cell and filling in the background
+from openpyxl.worksheet.table import Table, TableStyleInfo, TableColumn # Used for adding tables to the excel file
+from openpyxl.worksheet.filters import AutoFilter # Used for the filter buttons in each table's header
+from openpyxl.utils import get_column_letter # Used for finding the range of a table
+from openpyxl.cell import WriteOnlyCell # Used for streaming styled cells into the workbook
+
+from StockDashboardApplication.program_code.graphs import standard_stock_graph, open_high_low_close_graph, \
+    ratio_history_graph, summary_graph
+from StockDashboardApplication.program_code.aggregations import SUMMARY_COLUMNS
+from StockDashboardApplication.program_code.indicators import SMA_WINDOWS, ATR_WINDOW, VOLATILITY_WINDOW
+from StockDashboardApplication.program_code.dashboard_model import build_model, format_amount, format_date, \
+    format_price, format_percent, running_state_table, RUNNING_STATE_SHEET
+from StockDashboardApplication.program_code.parallel_sheets import SheetWriter, PARALLEL_MIN_ROWS
+from StockDashboardApplication.program_code.profiling import profiled
+
+# openpyxl always warns when a table is added to a streamed sheet; the table columns are added by make_pivot_table
+warnings.filterwarnings('ignore', message='In write-only mode you must add table columns manually')
+
+# Tested approximate dimensions of one standard Excel cell
+CELL_WIDTH = 1.694
+CELL_HEIGHT = 0.51
+
+# Number of dataframe rows converted at a time while streaming a table into the workbook
+CHUNK_ROWS = 10000
+
+# Most recent periods shown in each summary sheet's chart
+SUMMARY_CHART_PERIODS = 60
+
+# Version of the dashboard's layout.  Change it whenever the dashboard's sheets, cells or charts change, so
+# dashboards cached with the old layout are created again.
+LAYOUT_VERSION = 2
+
+# Colors
+BG_COLOR = 'D3D3D3' # normal background color
+FG_COLOR = '000000' # text color
+INFO_BG_COLOR = 'FFFFFF' # color for chart and text background
+
+# Writes every row of a dataframe into a streamed sheet (missing values become empty cells).
+# Rows are streamed a chunk at a time, so memory stays the same no matter how long the table is.
+def stream_rows(ws, table):
+    for chunk_start in range(0, table.shape[0], CHUNK_ROWS):
+        chunk = table.iloc[chunk_start:chunk_start + CHUNK_ROWS]
+        for row in chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None):
+            ws.append(row)
+
+# Makes a pivot table given the necessary data.  If a sheet writer is writing the table's rows in a worker
+# process, only the header is written here.  kept_rows rows of an existing dashboard go between the header and
+# the table's rows (see refresh.py); they are not written here, but the Excel table covers them.
+@profiled('make_pivot_table')
+def make_pivot_table(wb, table, name, header, sheet_writer=None, kept_rows=0):
+    ws = wb.create_sheet(name)
+    rows = kept_rows + table.shape[0]
+    columns = table.shape[1]
+
+    # Write the header followed by every row of the dataframe
+    ws.append(header)
+    if sheet_writer is not None and sheet_writer.has_sheet(name):
+        sheet_writer.add(ws)
+    else:
+        stream_rows(ws, table)
+
+    # Format the cells as an Excel table (the columns are named here, since streamed cells cannot be read back)
+    table_range = f'A1:{get_column_letter(columns)}{rows + 1}'
+    excel_table = Table(displayName=f'Table{len(wb.sheetnames)}', ref=table_range, autoFilter=AutoFilter(ref=table_range),
+                        tableColumns=[TableColumn(id=i + 1, name=column_name) for i, column_name in enumerate(header)])
+    excel_table.tableStyleInfo = TableStyleInfo(name='TableStyleMedium9', showRowStripes=True)
+    ws.add_table(excel_table)
+    return (name, rows + 1, columns)
+
+# Adds in the necessary pivot tables from which the graphs will be constructed.  excel_path is either the user's
+# path and the file name (see save_workbook) or a writable stream.  Everything the dashboard shows is calculated
+# by build_model first (unless the model is given); this only writes it to the workbook.
+# If a pool of worker processes is given (see parallel_sheets.py), the tables of a long history are written by
+# the workers while the dashboard is made.  kept_rows gives the number of rows of each sheet (by name) that are
+# kept from an existing dashboard, when only the rows after them are given (see refresh.py).
+@profiled('add_pivot_tables', hot_path=True)
+def add_pivot_tables(ticker_symbol, all_dataframes, excel_path, model=None, sheet_pool=None, kept_rows=None):
+    # Put all of the dataframes with all of the data into separate variables
+    df = all_dataframes[0]
+    q_is_df = all_dataframes[1]
+    q_bs_df = all_dataframes[2]
+    a_is_df = all_dataframes[3]
+    a_bs_df = all_dataframes[4]
+
+    # Add the pivot tables
+    general_data_titles = ('Stock Data', 'Quarterly Income Statement Data', 'Quarterly Balance Sheet Data',
+                           'Annual Income Statement Data', 'Annual Balance Sheet Data')
+
+    # Start writing the data tables in the worker processes before anything else, so they are written while the
+    # model and dashboard are made
+    sheet_writer = None
+    if sheet_pool is not None and df.shape[0] >= PARALLEL_MIN_ROWS:
+        sheet_writer = SheetWriter(sheet_pool)
+        for title, table in zip(general_data_titles, all_dataframes):
+            sheet_writer.submit(title, table, [str(di) for di in table.columns.tolist()])
+
+    if model is None:
+        model = build_model(ticker_symbol, all_dataframes)
+
+    if sheet_writer is not None:
+        for name, table in model['Charts'].items():
+            sheet_writer.submit(name, table, [str(di) for di in table.columns.tolist()])
+        for period_name, table in model['Summaries'].items():
+            sheet_writer.submit(f'{period_name} Summary', table, [str(di) for di in table.columns.tolist()])
+
+    # A list storing information on each pivot table
+    pivot_list = []
+    kept_rows = kept_rows or {}
+
+    # Open a new workbook; every sheet, chart and dashboard cell is streamed to it in a single pass
+    wb = openpyxl.Workbook(write_only=True)
+
+    make_pivot_table(wb, df, general_data_titles[0], [str(di) for di in df.columns.tolist()], sheet_writer,
+                     kept_rows.get(general_data_titles[0], 0))
+    make_pivot_table(wb, q_is_df, general_data_titles[1], [str(di) for di in q_is_df.columns.tolist()], sheet_writer)
+    make_pivot_table(wb, q_bs_df, general_data_titles[2], [str(di) for di in q_bs_df.columns.tolist()], sheet_writer)
+    make_pivot_table(wb, a_is_df, general_data_titles[3], [str(di) for di in a_is_df.columns.tolist()], sheet_writer)
+    make_pivot_table(wb, a_bs_df, general_data_titles[4], [str(di) for di in a_bs_df.columns.tolist()], sheet_writer)
+    for name, chart_table in model['Charts'].items():
+        pivot_list.append(make_pivot_table(wb, chart_table, name, [str(di) for di in chart_table.columns.tolist()],
+                                           sheet_writer))
+
+    # Make the dashboard
+    create_dashboard(wb, model, general_data_titles, pivot_list)
+
+    # Weekly, monthly, quarterly and yearly summaries of the prices
+    summary_list = []
+    for period_name, summary_table in model['Summaries'].items():
+        summary_list.append(make_pivot_table(wb, summary_table, f'{period_name} Summary',
+                                             [str(di) for di in summary_table.columns.tolist()], sheet_writer,
+                                             kept_rows.get(f'{period_name} Summary', 0)))
+    add_summary_charts(wb, summary_list)
+
+    # The running state of the whole history's statistics, for refreshing the dashboard later (see refresh.py)
+    state_table = running_state_table(model['Volatility'])
+    make_pivot_table(wb, state_table, RUNNING_STATE_SHEET, [str(di) for di in state_table.columns.tolist()])
+    wb[RUNNING_STATE_SHEET].sheet_state = 'hidden'
+
+    # Put the rows written by the worker processes into their sheets
+    if sheet_writer is not None:
+        sheet_writer.finish(wb)
+
+    # Write the finished workbook to disk exactly once
+    return save_workbook(wb, excel_path)
+
+# Adds a chart of the volume, closing price and VWAP beside each summary table
+@profiled('summary_charts')
+def add_summary_charts(wb_obj, summary_list):
+    volume_col = SUMMARY_COLUMNS.index('Volume') + 1
+    price_cols = ((SUMMARY_COLUMNS.index('Close') + 1, 'Close'), (SUMMARY_COLUMNS.index('VWAP') + 1, 'VWAP'))
+    for entry in summary_list:
+        summary_worksheet = wb_obj[entry[0]]
+        summary_chart = summary_graph(wb_obj, entry, entry[0], volume_col, price_cols, CELL_WIDTH * 9,
+                                      CELL_HEIGHT * 21, INFO_BG_COLOR, SUMMARY_CHART_PERIODS)
+        summary_worksheet.add_chart(summary_chart, anchor=f'{get_column_letter(entry[2] + 2)}2')
+
+# Creates the dashboard in memory and returns the bytes of the excel file, without writing anything to disk
+def dashboard_bytes(ticker_symbol, all_dataframes, sheet_pool=None):
+    buffer = io.BytesIO()
+    add_pivot_tables(ticker_symbol, all_dataframes, buffer, sheet_pool=sheet_pool)
+    return buffer.getvalue()
+
+# Saves the workbook to the user's path, or to the current directory if that path cannot be used.
+# A streamed workbook can only be saved once, so the path is checked before saving.
+# A writable stream (e.g. io.BytesIO) can be given instead of the path, and is returned once written to.
+@profiled('save_workbook')
+def save_workbook(wb, excel_path):
+    if hasattr(excel_path, 'write'):
+        wb.save(excel_path)
+        return excel_path
+
+    directory = os.path.dirname(excel_path[0]) or '.'
+    if os.path.isdir(directory) and os.access(directory, os.W_OK): # Try user's path
+        wb.save(filename=excel_path[0])
+        return excel_path[0]
+    else: # Put in same directory
+        print("Could not find given directory.  Saving in current directory...")
+        wb.save(filename=excel_path[1])
+        print("Successfully saved to directory.")
+        return excel_path[1]
+
+# The function responsible for making the visual (dashboard) from the dashboard model
+@profiled('create_dashboard')
+def create_dashboard(wb_obj, model, general_data_titles, pivot_list):
+    ticker_symbol = model['Ticker']
+
+    # Create the dashboard worksheet
+    dashboard_worksheet = wb_obj.create_sheet('Dashboard')
+
+    # The workbook's sheets can only be written row by row, so the dashboard's cells are laid out in a
+    # small in-memory sheet first
+    layout_worksheet = openpyxl.Workbook().active
+
+    # Hide the general data sheets
+    for entry in general_data_titles:
+        wb_obj[entry].sheet_state = 'hidden'
+
+    # Set the dashboard to be the first sheet the user sees upon opening the file
+    wb_obj.active = wb_obj['Dashboard']
+
+    # Hide the gridlines for a cleaner look
+    dashboard_worksheet.sheet_view.showGridLines = False
+
+    # Add in the background
+    cols = ('A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U',
+            'V', 'W', 'X')
+    ranges = (
+        (cols, (1, 53)), # Background
+        (cols[1:10], (26, 32)), # In between the charts
+        (cols[7:10], (35, 51)), # Beside the bottom chart
+        (cols[11:14], (4, 32)) # On the right side
+    )
+    color_background(layout_worksheet, BG_COLOR, INFO_BG_COLOR, ranges)
+
+    # Add in data
+    add_price_stats(layout_worksheet, ticker_symbol, model['Prices'], model['Volatility'])
+    add_calculations(layout_worksheet, 5, 12, model['Financial Health'], model['Growth'])
+    add_special_thanks(layout_worksheet, 40, 12)
+
+    # Stream the laid out cells into the dashboard
+    stream_cells(layout_worksheet, dashboard_worksheet)
+
+    # Add the visuals
+    add_dashboard_charts(wb_obj, dashboard_worksheet, ticker_symbol, pivot_list, model['Charts']['Closing Table'],
+                         model['OHLC Date Format'])
+
+    # Hide all pivot table worksheets
+    for entry in pivot_list:
+        wb_obj[entry[0]].sheet_state = 'hidden'
+
+# Adds the header, statistics overview and volatility sections (everything that changes with each trading day)
+# from the model's price statistics and volatility
+def add_price_stats(sheet, ticker_symbol, prices, volatility):
+    last_close = round(prices['Last Close'], 2)
+    volume = "{:,}".format(prices['Volume'])
+    day_range = (round(prices['Day Range'][0], 2), round(prices['Day Range'][1], 2))
+    year_range = (round(prices['Year Range'][0], 2), round(prices['Year Range'][1], 2))
+    is_date = format_date(prices['Report Date'])
+    revenue = format_amount(prices['Revenue'])
+    net_income = format_amount(prices['Net Income'])
+
+    add_stat_overview(sheet, 26, 2, last_close, volume, day_range, year_range, is_date, revenue, net_income)
+    add_volatility_stats(sheet, 36, 8, volatility)
+
+    # Set font and text for the header
+    title_font_style = Font(size="14", bold=True, name='Arial', color=FG_COLOR)
+    sheet.cell(row=1, column=2, value=f'{ticker_symbol} Dashboard').font = title_font_style
+    sub_title_font_style = Font(size="18", name='Arial', color=FG_COLOR)
+    sheet.cell(row=2, column=2, value=f'${last_close}').font = sub_title_font_style
+    note_font_style = Font(size="8", italic=True, name='Arial', color=FG_COLOR)
+    sheet.cell(row=2, column=4, value=f'* Price from last close.').font = note_font_style
+
+# Adds the four charts to the dashboard
+@profiled('dashboard_charts')
+def add_dashboard_charts(wb_obj, dashboard_worksheet, ticker_symbol, pivot_list, standard_stock_table, ohlc_date_format):
+    closing_dates = (standard_stock_table.at[0, 'Date'], standard_stock_table.at[standard_stock_table.shape[0] - 1, 'Date'])
+    standard_chart = standard_stock_graph(wb_obj, pivot_list[0], ticker_symbol, CELL_WIDTH * 9, CELL_HEIGHT * 21,
+                                          INFO_BG_COLOR, closing_dates)
+    open_high_low_close_chart = open_high_low_close_graph(wb_obj, pivot_list[1], CELL_WIDTH * 5, CELL_HEIGHT * 18, INFO_BG_COLOR,
+                                                          ohlc_date_format)
+    ratio_history_chart = ratio_history_graph(wb_obj, pivot_list[2], 'Financial Health History', CELL_WIDTH * 8,
+                                              CELL_HEIGHT * 21, INFO_BG_COLOR)
+    growth_history_chart = ratio_history_graph(wb_obj, pivot_list[3], 'Growth History (%)', CELL_WIDTH * 8,
+                                               CELL_HEIGHT * 18, INFO_BG_COLOR)
+
+    dashboard_worksheet.add_chart(standard_chart, anchor='B4')
+    dashboard_worksheet.add_chart(open_high_low_close_chart, anchor='B34')
+    dashboard_worksheet.add_chart(ratio_history_chart, anchor='P4')
+    dashboard_worksheet.add_chart(growth_history_chart, anchor='P34')
+
+# Copies every cell (value and style) of an in-memory sheet into a streamed sheet, row by row.
+# Setting a cell's style is slow and most cells share a few styles (e.g. the background), so each style is only
+# copied once and one styled cell is kept per style and column; a row is written as soon as it is appended, so
+# the same cells are given the next row's values.  Cells with neither a value nor a style are left empty.
+@profiled('stream_cells')
+def stream_cells(source, target):
+    styles = {} # Copied font, fill, border, alignment and number format, by the source cell's style
+    styled_cells = {} # Streamed cells, by the source cell's style and column
+    for row in source.iter_rows():
+        cells = []
+        for cell in row:
+            if not cell.has_style:
+                cells.append(cell.value)
+                continue
+
+            key = (cell.style_id, cell.column)
+            if key not in styled_cells:
+                if cell.style_id not in styles:
+                    styles[cell.style_id] = (copy(cell.font), copy(cell.fill), copy(cell.border),
+                                             copy(cell.alignment), cell.number_format)
+                new_cell = WriteOnlyCell(target)
+                new_cell.font, new_cell.fill, new_cell.border, new_cell.alignment, new_cell.number_format = \
+                    styles[cell.style_id]
+                styled_cells[key] = new_cell
+            styled_cells[key].value = cell.value
+            cells.append(styled_cells[key])
+        target.append(cells)
+
+# Paints the background with specific colors
+@profiled('color_background')
+def color_background(sheet, general_background, text_background, ranges):
+    bg_range = ranges[0]
+    # Fill in the background
+    for c in bg_range[0]:
+        for r in range(bg_range[1][0], bg_range[1][1]):
+            sheet[f'{c}{r}'].fill = PatternFill(fgColor=general_background, fill_type="solid")
+
+    # Fill in the parts where text will be
+    txt_ranges = ranges[1:]
+    for my_range in txt_ranges:
+        for c in my_range[0]:
+            for r in range(my_range[1][0], my_range[1][1]):
+                sheet[f'{c}{r}'].fill = PatternFill(fgColor=text_background, fill_type="solid")
+
+# Add in the statistcs overview
+def add_stat_overview(sheet, row_start, col_start, last_close, volume, day_range, year_range, is_date, revenue, dividends):
+    # Header
+    font_style = Font(size="14", bold=True, name='Arial', color=FG_COLOR)
+    sheet.cell(row=row_start, column=col_start, value='Statistics Overview').font = font_style
+
+    # Notice message
+    font_style = Font(size="6", italic=True, name='Arial', color=FG_COLOR)
+    sheet.cell(row=row_start, column=col_start+3, value='* NOTICE: Stats do not include today\'s values.').font = font_style
+
+    font_style = Font(size="9", name='Arial', color=FG_COLOR)
+    spacing = '     '
+
+    # Previous Close
+    sheet.cell(row=row_start+2, column=col_start+1, value=f'Previous Close:{spacing}${last_close}').font = font_style
+
+    # Volume Traded
+    sheet.cell(row=row_start+3, column=col_start+1, value=f'Volume Traded:{spacing}{volume} shares').font = font_style
+
+    # Day's Range
+    sheet.cell(row=row_start+4, column=col_start+1, value=f'Day\'s Range:{spacing}${day_range[0]} - ${day_range[1]}').font = font_style
+
+    # 52-Week Range
+    sheet.cell(row=row_start+2, column=col_start+5, value=f'52-Week Range:{spacing}${year_range[0]} - ${year_range[1]}').font = font_style
+
+    # Revenue
+    sheet.cell(row=row_start+3, column=col_start+5, value=f'Revenue ({is_date}):{spacing}${revenue}').font = font_style
+
+    # Dividend
+    sheet.cell(row=row_start+4, column=col_start+5, value=f'Net Income ({is_date}):{spacing}${dividends}').font = font_style
+
+# Adds in the moving averages and volatility of the prices (from summarize_indicators)
+def add_volatility_stats(sheet, row_start, col_start, volatility):
+    # Header
+    header_font_style = Font(size="14", bold=True, name='Arial', color=FG_COLOR)
+    sheet.cell(row=row_start, column=col_start, value='Volatility').font = header_font_style
+
+    # Sub-header
+    sub_header_font_style = Font(size="8", italic=True, name='Arial', color=FG_COLOR)
+    sheet.cell(row=row_start+1, column=col_start, value=f"As of {format_date(volatility['Date'])}").font = sub_header_font_style
+
+    font_style = Font(size="9", name='Arial', color=FG_COLOR)
+
+    bands = 'N/A'
+    if volatility['Lower Band'] is not None:
+        bands = f"{format_price(volatility['Lower Band'])} - {format_price(volatility['Upper Band'])}"
+
+    rows = [(f'{window}-Day SMA:', format_price(volatility[f'SMA {window}'])) for window in SMA_WINDOWS]
+    rows.append(('Bollinger Bands:', bands))
+    rows.append((f'ATR ({ATR_WINDOW} days):', format_price(volatility['ATR'])))
+    rows.append((f'Volatility ({VOLATILITY_WINDOW} days):', format_percent(volatility['Volatility'])))
+    rows.append(('Volatility (1 year):', format_percent(volatility['Yearly Volatility'])))
+
+    max_drawdown = volatility['Max Drawdown']
+    rows.append(('Max Drawdown:', format_percent(None if max_drawdown is None else max_drawdown[0])))
+
+    for i, (label, value) in enumerate(rows):
+        sheet.cell(row=row_start+i+3, column=col_start, value=label).font = font_style
+        sheet.cell(row=row_start+i+3, column=col_start+2, value=value).font = font_style
+
+    # When the largest fall happened (nothing goes beside it, which also clears the last day of older dashboards'
+    # high - low list when they are refreshed)
+    note = None
+    if max_drawdown is not None:
+        note = f'From {format_date(max_drawdown[1])} to {format_date(max_drawdown[2])}'
+    sheet.cell(row=row_start+len(rows)+3, column=col_start, value=note).font = sub_header_font_style
+    sheet.cell(row=row_start+len(rows)+3, column=col_start+2, value=None)
+
+# Adds in calculations
+def add_calculations(sheet, row_start, col_start, financial_health, growth):
+    # Get calculations (from the model's financial health and growth)
+    ratio_date = format_date(financial_health['As Of'])
+    quick_ratio = financial_health['Quick Ratio']
+    current_ratio = financial_health['Current Ratio']
+    debt_to_equity = financial_health['Debt-to-Equity']
+    if quick_ratio == None:
+        quick_ratio = 'Could not calculate.'
+    else:
+        quick_ratio = round(quick_ratio, 2)
+    if current_ratio == None:
+        current_ratio = 'Could not calculate.'
+    else:
+        current_ratio = round(current_ratio, 2)
+    if debt_to_equity == None:
+        debt_to_equity = 'Could not calculate.'
+    else:
+        debt_to_equity = round(debt_to_equity, 2)
+
+    growth_date = format_date(growth['As Of'])
+    revenue_growth = growth['Revenue Growth']
+    operating_income_growth = growth['Operating Income Growth']
+    net_income_growth = growth['Net Income Growth']
+    if revenue_growth == None:
+        revenue_growth = 'Could not calculate.'
+    else:
+        revenue_growth = round(revenue_growth, 2)
+    if operating_income_growth == None:
+        operating_income_growth = 'Could not calculate.'
+    else:
+        operating_income_growth = round(operating_income_growth, 2)
+    if net_income_growth == None:
+        net_income_growth = 'Could not calculate.'
+    else:
+        net_income_growth = round(net_income_growth, 2)
+
+    # Header 1
+    header_font_style = Font(size="14", bold=True, name='Arial', color=FG_COLOR)
+    sheet.cell(row=row_start, column=col_start, value='Financial Health').font = header_font_style
+
+    sub_header_font_style = Font(size="8", italic=True, name='Arial', color=FG_COLOR)
+    sheet.cell(row=row_start+1, column=col_start, value=f'As of {ratio_date}').font = sub_header_font_style
+
+    font_style = Font(size="9", name='Arial', color=FG_COLOR)
+
+    # Quick Ratio
+    sheet.cell(row=row_start+3, column=col_start, value=f'Quick Ratio: {quick_ratio}').font = font_style
+
+    # Current Ratio
+    sheet.cell(row=row_start+4, column=col_start, value=f'Current Ratio: {current_ratio}').font = font_style
+
+    # Debt-to-Equity
+    sheet.cell(row=row_start+5, column=col_start, value=f'Debt-to-Equity: {debt_to_equity}').font = font_style
+
+    # Header 2
+    sheet.cell(row=row_start+8, column=col_start, value='Growth').font = header_font_style
+
+    # Sub header 2
+    sheet.cell(row=row_start + 9, column=col_start, value=f'As of {growth_date}').font = sub_header_font_style
+
+    # Revenue growth
+    sheet.cell(row=row_start+11, column=col_start, value=f'Revenue Growth: {revenue_growth}%').font = font_style
+
+    # Operating Income Growth
+    sheet.cell(row=row_start+12, column=col_start,
+               value=f'Operating Income Growth: {operating_income_growth}%').font = font_style
+
+    # Net Income Growth
+    sheet.cell(row=row_start + 13, column=col_start,
+               value=f'Net Income Growth: {net_income_growth}%').font = font_style
+
+# Add special thanks message
+def add_special_thanks(sheet, row_start, col_start):
+    font_style = Font(size="9", name='Arial', color=FG_COLOR)
+
+    # Header
+    sheet.cell(row=row_start, column=col_start, value='Special Thanks To:').font = font_style
+
+    # List to thank
+    sheet.cell(row=row_start+2, column=col_start, value='*   Yahoo').font = font_style
+    sheet.cell(row=row_start+3, column=col_start, value='*   Alpha Vantage').font = font_style
+
+    # Reason
+    sheet.cell(row=row_start+5, column=col_start, value='... for providing company data.').font = font_style
@@ -0,0 +1,96 @@
+# A module for keeping finished dashboards on disk, stored under a hash of the data they were made from, so a
+# dashboard whose data has not changed is never created twice
+
+import hashlib # Used for the hash of the data
+import os # Used for building file paths and finding the size of the cache
+
+import pandas as pd # Used for hashing the dataframes
+
+from StockDashboardApplication.program_code.data_cache import replace_file
+from StockDashboardApplication.program_code.dashboard import dashboard_bytes, LAYOUT_VERSION
+from StockDashboardApplication.program_code.profiling import profiled
+
+# Where the finished dashboards are kept
+DASHBOARD_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.do_stock_dashboard', 'dashboards')
+
+# Most bytes of dashboards kept; the least recently used ones are removed past this
+MAX_CACHE_BYTES = 500 * 2 ** 20
+
+# Gets the key of a dashboard: a hash of the ticker symbol, the layout version and every row of the prices and
+# statements (so it changes with a new trading day, a new report or a different number of years)
+@profiled('dashboard_key')
+def dashboard_key(ticker_symbol, all_dataframes):
+    digest = hashlib.sha256(f'{ticker_symbol.upper()}|{LAYOUT_VERSION}'.encode('utf-8'))
+    for table in all_dataframes:
+        digest.update('|'.join(str(column_name) for column_name in table.columns).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(table, index=True).values.tobytes())
+    return digest.hexdigest()
+
+# Finished dashboards on disk, removing the least recently used once they take up more than max_bytes
+class DashboardCache:
+    # Constructor
+    def __init__(self, cache_dir=None, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir or DASHBOARD_CACHE_DIR
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # Gets the path of a dashboard in the cache
+    def get_path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.xlsx')
+
+    # Gets the bytes of a cached dashboard, or None if it is not cached
+    def get(self, key):
+        path = self.get_path(key)
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+        except FileNotFoundError:
+            return None
+
+        # Mark it as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return content
+
+    # Adds a dashboard to the cache, then removes the least recently used ones if the cache is too large
+    def put(self, key, content):
+        def write(temp_path):
+            with open(temp_path, 'wb') as f:
+                f.write(content)
+        replace_file(self.get_path(key), write)
+        self.evict()
+
+    # Removes the least recently used dashboards until the cache is no larger than max_bytes
+    def evict(self):
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.xlsx'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for mtime, size, path in entries)
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    # Gets the bytes of a dashboard from the cache, creating (and caching) it if its data has not been seen before.
+    # Returns the bytes and whether they came from the cache.
+    def get_dashboard(self, ticker_symbol, all_dataframes):
+        key = dashboard_key(ticker_symbol, all_dataframes)
+        content = self.get(key)
+        if content is not None:
+            return (content, True)
+
+        content = dashboard_bytes(ticker_symbol, all_dataframes)
+        self.put(key, content)
+        return (content, False)
@@ -0,0 +1,145 @@
+# A module for calculating everything a dashboard shows (statistics, ratios and the tables behind each chart)
+# without creating any excel, so the same numbers can be shown as an excel file, JSon or a web page
+
+import datetime # Used for finding the last 52 weeks
+
+import pandas as pd # Used for checking for missing values
+
+from StockDashboardApplication.program_code.latest_statistics import FinancialHealth, Growth
+from StockDashboardApplication.program_code.downsampling import get_chart_tables, extend_chart_tables
+from StockDashboardApplication.program_code.aggregations import calendar_rollups
+from StockDashboardApplication.program_code.indicators import compute_indicators, summarize_indicators, add_overlays
+from StockDashboardApplication.program_code.profiling import profiled
+
+# Names of the chart tables, in the order the dashboard's charts use them
+CHART_TABLES = ('Closing Table', 'Open-High-Low-Close Table', 'Financial Health History', 'Growth History')
+
+# Hidden sheet keeping the running state of the statistics that cover the whole history (the highest close and
+# the maximum drawdown), so a refreshed dashboard can continue them without reading every day again
+RUNNING_STATE_SHEET = 'Running State'
+
+# Columns of the running state table
+RUNNING_STATE_COLUMNS = ('Statistic', 'Value', 'Start', 'End', 'As Of')
+
+# Formats a dollar amount from a statement with commas, e.g. 1,234,567
+def format_amount(value):
+    if pd.isna(value):
+        return 'N/A'
+    return "{:,.0f}".format(value)
+
+# Formats a report's fiscal date ending, e.g. 2021-06-30
+def format_date(value):
+    if pd.isna(value):
+        return 'N/A'
+    return value.strftime('%Y-%m-%d')
+
+# Formats a price, e.g. $123.45
+def format_price(value):
+    if value is None:
+        return 'N/A'
+    return f'${round(value, 2)}'
+
+# Formats a fraction as a percentage, e.g. 23.4%
+def format_percent(value):
+    if value is None:
+        return 'N/A'
+    return f'{value * 100:.1f}%'
+
+# Calculates the header and statistics overview: the last close, the last day's volume and range, the 52-week
+# range and the latest quarter's revenue (less the cost of revenue) and net income
+def price_stats(df, q_is_df):
+    df_last_row = df.shape[0] - 1
+    last_year = df[df['Date'] > df.at[df_last_row, 'Date'] - datetime.timedelta(weeks=52)]
+    revenue = q_is_df.at[0, 'totalRevenue'] - q_is_df.at[0, 'costOfRevenue']
+    net_income = q_is_df.at[0, 'netIncome']
+    return {
+        'Date': df.at[df_last_row, 'Date'],
+        'Last Close': float(df.at[df_last_row, 'Close']),
+        'Volume': int(df.at[df_last_row, 'Volume']),
+        'Day Range': (float(df.at[df_last_row, 'Low']), float(df.at[df_last_row, 'High'])),
+        'Year Range': (float(last_year['Low'].min()), float(last_year['High'].max())),
+        'Report Date': q_is_df.at[0, 'fiscalDateEnding'],
+        'Revenue': None if pd.isna(revenue) else float(revenue),
+        'Net Income': None if pd.isna(net_income) else float(net_income)
+    }
+
+# Gets the latest quick, current and debt-to-equity ratios (None if they could not be calculated)
+def financial_health_stats(financial_health, q_bs_df):
+    return {
+        'As Of': q_bs_df.at[0, 'fiscalDateEnding'],
+        'Quick Ratio': financial_health.quick_ratio(),
+        'Current Ratio': financial_health.current_ratio(),
+        'Debt-to-Equity': financial_health.debt_to_equity()
+    }
+
+# Gets the latest revenue, operating income and net income growth in percent (None if they could not be calculated)
+def growth_stats(growth, a_is_df):
+    return {
+        'As Of': a_is_df.at[0, 'fiscalDateEnding'],
+        'Revenue Growth': growth.revenue_growth(),
+        'Operating Income Growth': growth.operating_income_growth(),
+        'Net Income Growth': growth.net_income_growth()
+    }
+
+# Makes the running state table from the model's volatility (see summarize_indicators)
+def running_state_table(volatility):
+    highest_close = volatility['Highest Close'] or (None, None)
+    max_drawdown = volatility['Max Drawdown'] or (None, None, None)
+    rows = [('Highest Close', highest_close[0], highest_close[1], None, volatility['Date']),
+            ('Max Drawdown', max_drawdown[0], max_drawdown[1], max_drawdown[2], volatility['Date'])]
+    return pd.DataFrame(rows, columns=list(RUNNING_STATE_COLUMNS))
+
+# Reads the running state table back into the running state summarize_indicators continues from, or None if it
+# is incomplete (e.g. the history had no closing prices)
+def read_running_state(table):
+    rows = {row[0]: row[1:] for row in table.itertuples(index=False, name=None)}
+    highest_close = rows.get('Highest Close')
+    max_drawdown = rows.get('Max Drawdown')
+    if highest_close is None or max_drawdown is None or pd.isna(highest_close[0]) or pd.isna(max_drawdown[0]):
+        return None
+    return {
+        'Date': pd.Timestamp(highest_close[3]),
+        'Highest Close': (float(highest_close[0]), pd.Timestamp(highest_close[1])),
+        'Max Drawdown': (float(max_drawdown[0]), pd.Timestamp(max_drawdown[1]), pd.Timestamp(max_drawdown[2]))
+    }
+
+# Calculates everything the dashboard shows from the prices and statements (in the order of fetch_stock_data).
+# The model only holds numbers, dates and dataframes, so any renderer can use it.  The price charts are made for
+# the years of history in the prices, unless chart_years is given (e.g. a refreshed dashboard keeps its horizon).
+# A refreshed dashboard only gives the most recent days, with the running state the statistics of the whole
+# history are continued from and, for long histories, the closing and open-high-low-close tables it already has.
+@profiled('build_model')
+def build_model(ticker_symbol, all_dataframes, chart_years=None, running_state=None, saved_charts=None):
+    df = all_dataframes[0]
+    q_is_df = all_dataframes[1]
+    q_bs_df = all_dataframes[2]
+    a_is_df = all_dataframes[3]
+
+    # The tables the two price charts are built from, reduced to a fixed number of points for long histories,
+    # with the moving averages and bands drawn over the closing prices
+    if saved_charts is None:
+        standard_stock_table, open_high_low_close_table, ohlc_date_format = get_chart_tables(df, chart_years)
+    else:
+        standard_stock_table, open_high_low_close_table, ohlc_date_format = extend_chart_tables(*saved_charts, df,
+                                                                                              chart_years)
+    indicators = compute_indicators(df)
+    standard_stock_table = add_overlays(standard_stock_table, indicators)
+
+    # Every report's financial health and growth, calculated at once
+    financial_health = FinancialHealth(q_bs_df, q_is_df)
+    growth = Growth(a_is_df)
+
+    # Oldest report first, so the charts read from left to right
+    chart_tables = (standard_stock_table, open_high_low_close_table, financial_health.ratios.iloc[::-1].reset_index(),
+                    growth.growth.iloc[::-1].reset_index())
+
+    return {
+        'Ticker': ticker_symbol,
+        'Prices': price_stats(df, q_is_df),
+        'Volatility': summarize_indicators(df, indicators, running_state),
+        'Financial Health': financial_health_stats(financial_health, q_bs_df),
+        'Growth': growth_stats(growth, a_is_df),
+        'Charts': dict(zip(CHART_TABLES, chart_tables)),
+        'OHLC Date Format': ohlc_date_format,
+        'Summaries': calendar_rollups(df)
+    }
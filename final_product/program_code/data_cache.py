@@ -0,0 +1,102 @@
+# A module for keeping downloaded prices and statements on disk so they are not downloaded again
+
+import datetime # Used for finding the days that are missing from the cache
+import json # Used for storing the statements
+import os # Used for building file paths and replacing files
+import tempfile # Used for writing cache files safely
+import time # Used for checking how old the statements are
+
+import pandas as pd # Used for storing and combining the prices
+
+# Where the cached data is kept
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.do_stock_dashboard', 'cache')
+
+# Number of seconds before the statements are downloaded again (new ones come out once a quarter)
+FUNDAMENTALS_TTL = 7 * 24 * 60 * 60
+
+# Number of seconds before days that had no prices yet (e.g. a weekend, a holiday or today before the market
+# closes) are asked for again
+NO_NEW_DAYS_TTL = 60 * 60
+
+# Start of the error yahoo's reader raises when there are no trading days in the range it was asked for
+NO_DATA_MESSAGE = 'No data fetched'
+
+# Gets the folder holding the cached data of a ticker symbol
+def get_ticker_dir(ticker_symbol, cache_dir=None):
+    ticker_dir = os.path.join(cache_dir or CACHE_DIR, ticker_symbol.upper())
+    os.makedirs(ticker_dir, exist_ok=True)
+    return ticker_dir
+
+# Writes a file all at once, so other processes never read a half-written file
+def replace_file(path, write):
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    os.close(fd)
+    try:
+        write(temp_path)
+        os.replace(temp_path, path)
+    except:
+        os.remove(temp_path)
+        raise
+
+# Downloads the prices between the start and end dates, or returns None if there are no trading days between them
+# (any other error is raised)
+def fetch_new_days(ticker_symbol, start_date, end_date, fetch_prices):
+    try:
+        prices = fetch_prices(ticker_symbol, start_date, end_date)
+    except Exception as e:
+        if NO_DATA_MESSAGE in str(e):
+            return None
+        raise
+    return prices if prices.shape[0] > 0 else None
+
+# Gets the prices between the start and end dates, only downloading the days that are not cached yet.  When there
+# are no new days yet, that is remembered for NO_NEW_DAYS_TTL seconds so they are not asked for again right away.
+def get_prices(ticker_symbol, start_date, end_date, fetch_prices, cache_dir=None):
+    path = os.path.join(get_ticker_dir(ticker_symbol, cache_dir), 'prices.pkl')
+    start = pd.Timestamp(start_date).normalize()
+    end = pd.Timestamp(end_date).normalize()
+
+    # The cache holds the prices and the range of days that have already been asked for
+    cached = pd.read_pickle(path) if os.path.exists(path) else None
+
+    if cached is None or start < cached['start']:
+        # Nothing useful cached; download the whole range
+        cached = {'start': start, 'end': end, 'prices': fetch_prices(ticker_symbol, start, end)}
+    elif end > cached['end']:
+        # Recently found that there are no trading days after the last cached day up to this end date
+        checked_end, checked_time = cached.get('checked', (None, 0))
+        if checked_end is not None and end <= checked_end and time.time() - checked_time < NO_NEW_DAYS_TTL:
+            return cached['prices'].loc[start:end]
+
+        # Only download the trading days after the last cached day
+        new_prices = fetch_new_days(ticker_symbol, cached['end'] + datetime.timedelta(days=1), end, fetch_prices)
+        if new_prices is None:
+            cached = dict(cached, checked=(end, time.time()))
+        else:
+            prices = pd.concat([cached['prices'], new_prices])
+            prices = prices[~prices.index.duplicated(keep='last')].sort_index()
+            cached = {'start': cached['start'], 'end': end, 'prices': prices}
+    else:
+        return cached['prices'].loc[start:end]
+
+    replace_file(path, lambda temp_path: pd.to_pickle(cached, temp_path))
+    return cached['prices'].loc[start:end]
+
+# Gets a statement (e.g. 'INCOME_STATEMENT'), only downloading it again once the cached one is too old
+def get_statement(function, ticker_symbol, api_key, fetch_statement, cache_dir=None, ttl=FUNDAMENTALS_TTL):
+    path = os.path.join(get_ticker_dir(ticker_symbol, cache_dir), f'{function}.json')
+
+    if os.path.exists(path) and time.time() - os.path.getmtime(path) < ttl:
+        with open(path) as f:
+            return json.load(f)
+
+    data = fetch_statement(function, ticker_symbol, api_key)
+
+    # Only keep real statements, not error messages
+    if 'quarterlyReports' in data and 'annualReports' in data:
+        def write(temp_path):
+            with open(temp_path, 'w') as f:
+                json.dump(data, f)
+        replace_file(path, write)
+
+    return data
@@ -0,0 +1,116 @@
+# A module for downloading the stock prices, income statements and balance sheets
+
+import threading # Used for creating the shared session only once
+from concurrent.futures import ThreadPoolExecutor # Used for downloading all of the data at the same time
+
+import requests # Used to access alpha vantage
+from requests.adapters import HTTPAdapter # Used for keeping connections open between requests
+
+from StockDashboardApplication.program_code import data_cache
+from StockDashboardApplication.program_code.rate_limiter import RequestScheduler
+from StockDashboardApplication.program_code.profiling import profiled, in_thread, count_response
+
+# Used to access alpha vantage data
+ALPHA_VANTAGE_URL = 'https://www.alphavantage.co/query'
+
+# Limits of the alpha vantage API key (free keys are limited to 5 calls per minute and 25 calls per day)
+ALPHA_VANTAGE_CALLS_PER_MINUTE = 5
+ALPHA_VANTAGE_CALLS_PER_DAY = 25
+
+# Words only used in alpha vantage's 'Information' reply when the calls-per-day limit has been reached ("Our standard
+# API rate limit is 25 requests per day."); its other replies (e.g. for the demo key or a premium endpoint) do not
+DAILY_LIMIT_WORDS = 'per day'
+
+# Number of seconds to wait for a response before giving up
+REQUEST_TIMEOUT = 15
+
+# Number of open connections kept for each host
+POOL_SIZE = 32
+
+# The session shared by every download
+_session = None
+_session_lock = threading.Lock()
+
+# Every alpha vantage request of this process goes through the same scheduler
+_scheduler = RequestScheduler(ALPHA_VANTAGE_CALLS_PER_MINUTE, ALPHA_VANTAGE_CALLS_PER_DAY)
+
+# A connection pool that gives every request a timeout, including those made inside pandas_datareader
+class TimeoutHTTPAdapter(HTTPAdapter):
+    # Constructor
+    def __init__(self, timeout, *args, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    # Sends a request, adding the timeout when none was given
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
+# Gets the session whose connections are kept open and reused for every ticker symbol
+def get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = TimeoutHTTPAdapter(REQUEST_TIMEOUT, pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+
+            # Count the bytes of every response for --profile
+            _session.hooks['response'].append(count_response)
+        return _session
+
+# Gets the daily stock prices from yahoo
+@profiled('fetch_prices')
+def fetch_prices(ticker_symbol, start_date, end_date):
+    # pandas_datareader is slow to import, so it is only imported once prices are needed
+    import pandas_datareader as web
+    return web.DataReader(ticker_symbol, 'yahoo', start_date, end_date, session=get_session())
+
+# Checks if alpha vantage refused a request because a call limit was reached.  Returns 'minute' for the
+# calls-per-minute limit (a 'Note'), 'day' for the calls-per-day limit (an 'Information' saying so) or None if it
+# was not refused.
+def refused_limit(data):
+    if 'quarterlyReports' in data:
+        return None
+    if 'Note' in data:
+        return 'minute'
+    if DAILY_LIMIT_WORDS in str(data.get('Information', '')):
+        return 'day'
+    return None
+
+# Downloads a statement from alpha vantage, without any limits
+@profiled('download_statement')
+def download_statement(function, ticker_symbol, api_key):
+    params = {'function': function, 'symbol': ticker_symbol, 'apikey': api_key}
+    response = get_session().get(ALPHA_VANTAGE_URL, params=params, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    data = response.json()
+
+    # Any other 'Information' (e.g. an invalid key or a premium endpoint) is an error, not a call limit
+    if 'Information' in data and refused_limit(data) is None:
+        raise ValueError(f"Alpha Vantage did not send the {function} of '{ticker_symbol}': {data['Information']}")
+    return data
+
+# Gets a statement (e.g. 'INCOME_STATEMENT' or 'BALANCE_SHEET') from alpha vantage as JSon, keeping within the
+# call limits and sharing one request between threads asking for the same statement
+def fetch_statement(function, ticker_symbol, api_key):
+    return _scheduler.request((function, ticker_symbol.upper()), refused_limit, download_statement,
+                              function, ticker_symbol, api_key)
+
+# Downloads the prices, income statement and balance sheet at the same time (from the local cache when possible)
+def fetch_all(ticker_symbol, start_date, end_date, api_key, use_cache=True):
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        if use_cache:
+            prices = pool.submit(in_thread(data_cache.get_prices), ticker_symbol, start_date, end_date, fetch_prices)
+            income_statement = pool.submit(in_thread(data_cache.get_statement), 'INCOME_STATEMENT', ticker_symbol,
+                                           api_key, fetch_statement)
+            balance_sheet = pool.submit(in_thread(data_cache.get_statement), 'BALANCE_SHEET', ticker_symbol, api_key,
+                                        fetch_statement)
+        else:
+            prices = pool.submit(in_thread(fetch_prices), ticker_symbol, start_date, end_date)
+            income_statement = pool.submit(in_thread(fetch_statement), 'INCOME_STATEMENT', ticker_symbol, api_key)
+            balance_sheet = pool.submit(in_thread(fetch_statement), 'BALANCE_SHEET', ticker_symbol, api_key)
+
+        return (prices.result(), income_statement.result(), balance_sheet.result())
@@ -0,0 +1,126 @@
+# A module for keeping the number of points in each chart small, no matter how much history is loaded
+
+import numpy as np # Used for picking the points to keep
+import pandas as pd # Used for joining the tables of an existing dashboard with the days after them
+
+from StockDashboardApplication.program_code.profiling import profiled
+
+# Most points shown in the closing price chart
+MAX_LINE_POINTS = 500
+
+# Most bars shown in the open-high-low-close chart
+MAX_OHLC_BARS = 120
+
+# Most recent days shown in the closing price and open-high-low-close charts of a dashboard with up to one year
+RECENT_DAYS = 30
+RECENT_BARS = 9
+
+# (most years of history, period of each bar, date format) for the open-high-low-close chart, by horizon.
+# Up to one year shows the most recent days, like the dashboard always has.
+OHLC_PERIODS = (
+    (1, 'D', 'ddd, m/d'),
+    (2, 'W-FRI', 'm/d/yy'),
+    (10, 'M', 'mmm yy'),
+    (30, 'Q', 'mmm yy'),
+    (None, 'Y', 'yyyy')
+)
+
+# Picks the points of a line that keep its shape (Largest-Triangle-Three-Buckets), returning their positions
+def lttb(x, y, threshold):
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # The first and last points are always kept; the rest are split into threshold - 2 buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    edges = np.append(edges, n)
+
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    selected = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2]
+
+        # Average of the next bucket
+        average_x = x[next_start:next_end].mean()
+        average_y = y[next_start:next_end].mean()
+
+        # Keep the point forming the largest triangle with the last kept point and the next bucket's average
+        areas = np.abs((x[selected] - average_x) * (y[start:end] - y[selected])
+                       - (x[selected] - x[start:end]) * (average_y - y[selected]))
+        selected = start + int(np.argmax(areas))
+        indices[i + 1] = selected
+
+    return indices
+
+# Reduces the closing prices to at most max_points rows, keeping the shape of the line
+def downsample_close(df, max_points=MAX_LINE_POINTS):
+    return downsample_line(df[['Date', 'Close']].dropna().reset_index(drop=True), max_points)
+
+# Reduces a table of closing prices by date to at most max_points rows (any other columns are kept with their rows)
+def downsample_line(table, max_points=MAX_LINE_POINTS):
+    # Dates as seconds since the first date, so the areas are calculated accurately
+    dates = table['Date'].values.astype('datetime64[s]').astype(np.int64)
+    x = (dates - dates[0]).astype(np.float64) if len(dates) > 0 else dates.astype(np.float64)
+    y = table['Close'].values.astype(np.float64)
+
+    return table.iloc[lttb(x, y, max_points)].reset_index(drop=True)
+
+# Groups the daily prices into one bar per period (e.g. 'W-FRI' or 'M'), each dated by its last trading day
+def resample_ohlc(df, period):
+    groups = df.groupby(df['Date'].dt.to_period(period), sort=True)
+    bars = groups.agg(Date=('Date', 'last'), Open=('Open', 'first'), High=('High', 'max'),
+                      Low=('Low', 'min'), Close=('Close', 'last'))
+    return bars.reset_index(drop=True)
+
+# Number of years of history in the prices
+def history_years(df):
+    if df.shape[0] == 0:
+        return 0
+    return (df['Date'].iloc[-1] - df['Date'].iloc[0]).days / 365.25
+
+# Gets the period of each open-high-low-close bar and its date format for a horizon of the given years
+def ohlc_period(years):
+    for max_years, period, number_format in OHLC_PERIODS:
+        if max_years is None or years <= max_years:
+            return (period, number_format)
+
+# Creates the tables the two charts are built from, choosing how much to reduce them by the horizon.
+# Returns the closing table, the open-high-low-close table and the date format of its bars.
+@profiled('get_chart_tables')
+def get_chart_tables(df, years=None):
+    if years is None:
+        years = history_years(df)
+
+    row_end = df.shape[0] + 1
+    if years <= OHLC_PERIODS[0][0]:
+        # Recent days only, the same as a dashboard with one year of history
+        standard_stock_table = df.loc[(row_end - RECENT_DAYS):row_end, ['Date', 'Close']].reset_index(drop=True)
+        open_high_low_close_table = df.loc[(row_end - RECENT_BARS):row_end, ['Date', 'Open', 'High', 'Low', 'Close']]
+        return (standard_stock_table, open_high_low_close_table.reset_index(drop=True), OHLC_PERIODS[0][2])
+
+    # The whole history, reduced to a fixed number of points and bars
+    period, number_format = ohlc_period(years)
+    standard_stock_table = downsample_close(df)
+    open_high_low_close_table = resample_ohlc(df, period).tail(MAX_OHLC_BARS).reset_index(drop=True)
+    return (standard_stock_table, open_high_low_close_table, number_format)
+
+# Adds the days after the chart tables of a long history (from an existing dashboard, for a horizon of the given
+# years) to them, without needing the older days.  The closing table's points and the new days are reduced to
+# MAX_LINE_POINTS again; only the last bar can hold days before the new ones, so it and every bar after it are
+# grouped again from the prices (which must hold every day of the last bar).  Returns the same as get_chart_tables.
+@profiled('extend_chart_tables')
+def extend_chart_tables(standard_stock_table, open_high_low_close_table, df, years):
+    period, number_format = ohlc_period(years)
+
+    new_days = df.loc[df['Date'] > standard_stock_table['Date'].iloc[-1], ['Date', 'Close']].dropna()
+    standard_stock_table = downsample_line(pd.concat([standard_stock_table, new_days], ignore_index=True))
+
+    last_bar = open_high_low_close_table['Date'].iloc[-1].to_period(period)
+    kept_bars = open_high_low_close_table[open_high_low_close_table['Date'].dt.to_period(period) < last_bar]
+    new_bars = resample_ohlc(df[df['Date'].dt.to_period(period) >= last_bar], period)
+    open_high_low_close_table = pd.concat([kept_bars, new_bars], ignore_index=True)
+    return (standard_stock_table, open_high_low_close_table.tail(MAX_OHLC_BARS).reset_index(drop=True), number_format)
@@ -1,28 +1,54 @@
 # A module for all of the graphs in the dashboard
 
-from openpyxl.chart import LineChart, StockChart, Reference # Used to make the charts
-from openpyxl.chart.axis import ChartLines # Used to display the lines in the stock chart
+import math # Used for rounding the spacing of the date labels
+
+from openpyxl.chart import LineChart, StockChart, BarChart, Reference, Series # Used to make the charts
+from openpyxl.chart.axis import ChartLines, DateAxis # Used to display the lines in the stock chart and dates
 from openpyxl.chart.updown_bars import UpDownBars # Used to display the bars in the stock chart
 from openpyxl.chart.data_source import NumData, NumVal # Used for "dummy" data in the stock chart
 from openpyxl.chart.shapes import GraphicalProperties # Used for changing background color
 
+# Picks the spacing and format of the labels on a date axis, so about 6 to 12 dates are shown
+def date_axis_units(first_date, last_date):
+    span = (last_date - first_date).days
+    if span <= 62:
+        return ('days', 7, 'd mmm yy')
+    if span <= 370:
+        return ('months', 1, 'mmm yy')
+    if span <= 3 * 366:
+        return ('months', 3, 'mmm yy')
+    return ('years', max(1, math.ceil(span / 365.25 / 10)), 'yyyy')
+
+# Titles the closing price chart by how much history it shows, e.g. "AAPL Closing Prices (Past 10 Years)"; a chart
+# of the most recent days (or without dates) shows "AAPL Recent Closing Prices"
+def closing_chart_title(ticker_symbol, date_range=None):
+    if date_range is None or (date_range[1] - date_range[0]).days <= 62:
+        return f"{ticker_symbol} Recent Closing Prices"
+    years = round((date_range[1] - date_range[0]).days / 365.25)
+    if years <= 1:
+        return f"{ticker_symbol} Closing Prices (Past Year)"
+    return f"{ticker_symbol} Closing Prices (Past {years} Years)"
+
 # Displays a graph that shows the closing values of each day
-def standard_stock_graph(wb_obj, graph_data, ticker_symbol, CHART_WIDTH, CHART_HEIGHT, chart_color):
+def standard_stock_graph(wb_obj, graph_data, ticker_symbol, CHART_WIDTH, CHART_HEIGHT, chart_color, date_range=None):
     # Get the data worksheet the chart will be based on
     data_worksheet = wb_obj[graph_data[0]]
 
-    # Convert to date
-    for i in range(2, graph_data[1] + 1):
-        # No need to have all the date names
-        if i % 5 == 0:
-            current_value = data_worksheet[f'A{i}'].value
-            data_worksheet[f'A{i}'].value = f'=TEXT({current_value}, "d mmm yy")'
-        else:
-            data_worksheet[f'A{i}'].value = "" # Remove all other dates
-
     # Create the chart
     line_chart = LineChart()
-    line_chart.title = f"{ticker_symbol} Recent Closing Prices"
+    line_chart.title = closing_chart_title(ticker_symbol, date_range)
+
+    # The dates in the first column are shown on a real date axis, leaving the data untouched
+    line_chart.x_axis = DateAxis(crossAx=100)
+    line_chart.y_axis.crossAx = 500
+    line_chart.x_axis.baseTimeUnit = 'days'
+    line_chart.x_axis.number_format = 'd mmm yy'
+    if date_range is not None:
+        time_unit, unit, number_format = date_axis_units(date_range[0], date_range[1])
+        line_chart.x_axis.majorTimeUnit = time_unit
+        line_chart.x_axis.majorUnit = unit
+        line_chart.x_axis.number_format = number_format
+
     line_chart.x_axis.title = ""
     line_chart.y_axis.title = ""
     line_chart.width = CHART_WIDTH
@@ -38,20 +64,28 @@ def standard_stock_graph(wb_obj, graph_data, ticker_symbol, CHART_WIDTH, CHART_H
     line_chart.add_data(values, titles_from_data=True)
     line_chart.set_categories(labels)
 
+    # Any indicators after the closing prices (e.g. moving averages) are drawn as thin dashed lines, with gaps
+    # until there is enough history to calculate them
+    for s in line_chart.series[1:]:
+        s.graphicalProperties.line.width = 9525
+        s.graphicalProperties.line.dashStyle = 'dash'
+    line_chart.display_blanks = 'gap'
+
     return line_chart
 
 # Displays a graph that displays the open, high, low, and close values of shares traded
-def open_high_low_close_graph(wb_obj, graph_data, CHART_WIDTH, CHART_HEIGHT, chart_color):
+def open_high_low_close_graph(wb_obj, graph_data, CHART_WIDTH, CHART_HEIGHT, chart_color, date_format='ddd, m/d'):
     # Get the data worksheet the chart will be based on
     data_worksheet = wb_obj[graph_data[0]]
 
-    for i in range(2, graph_data[1] + 1):
-        current_value = data_worksheet[f'A{i}'].value
-        data_worksheet[f'A{i}'].value = f'=TEXT({current_value}, "ddd, m/d")'
-
     # Create the chart
     stock_chart = StockChart()
     stock_chart.title = "Open-High-Low-Close"
+
+    # The bars are labelled with their dates (about 10 labels at most); the axis formats the dates,
+    # leaving the data untouched
+    stock_chart.x_axis.number_format = date_format
+    stock_chart.x_axis.tickLblSkip = max(1, math.ceil((graph_data[1] - 1) / 10))
     stock_chart.width = CHART_WIDTH
     stock_chart.height = CHART_HEIGHT
 
@@ -76,4 +110,67 @@ def open_high_low_close_graph(wb_obj, graph_data, CHART_WIDTH, CHART_HEIGHT, cha
     cache = NumData(pt=pts)
     stock_chart.series[-1].val.numRef.numCache = cache
 
-    return stock_chart
\ No newline at end of file
+    return stock_chart
+
+# Displays a graph that shows how calculations (e.g. ratios or growth) changed over every report
+def ratio_history_graph(wb_obj, graph_data, title, CHART_WIDTH, CHART_HEIGHT, chart_color):
+    # Get the data worksheet the chart will be based on
+    data_worksheet = wb_obj[graph_data[0]]
+
+    # Create the chart
+    line_chart = LineChart()
+    line_chart.title = title
+    line_chart.x_axis.title = ""
+    line_chart.y_axis.title = ""
+    line_chart.width = CHART_WIDTH
+    line_chart.height = CHART_HEIGHT
+
+    line_chart.plot_area.graphicalProperties = GraphicalProperties(solidFill=chart_color)
+
+    # Add values and report dates
+    values = Reference(data_worksheet, min_col=2, min_row=1, max_col=graph_data[2], max_row=graph_data[1])
+    labels = Reference(data_worksheet, min_col=1, min_row=2, max_col=1, max_row=graph_data[1])
+
+    # Add all values/ data and the proper titles
+    line_chart.add_data(values, titles_from_data=True)
+    line_chart.set_categories(labels)
+
+    # Leave a gap where a report could not be calculated
+    line_chart.display_blanks = 'gap'
+
+    return line_chart
+
+# Displays a graph of each period's volume (bars) with its closing price and VWAP (lines), for the most recent
+# max_periods periods of a summary table
+def summary_graph(wb_obj, graph_data, title, volume_col, price_cols, CHART_WIDTH, CHART_HEIGHT, chart_color,
+                  max_periods=None):
+    # Get the data worksheet the chart will be based on
+    data_worksheet = wb_obj[graph_data[0]]
+    first_row = 2 if max_periods is None else max(2, graph_data[1] - max_periods + 1)
+    last_row = graph_data[1]
+
+    labels = Reference(data_worksheet, min_col=1, min_row=first_row, max_col=1, max_row=last_row)
+
+    # Volume on the left axis
+    volume_chart = BarChart()
+    volume_chart.title = title
+    volume_chart.width = CHART_WIDTH
+    volume_chart.height = CHART_HEIGHT
+    volume_chart.y_axis.title = "Volume"
+    volume_chart.plot_area.graphicalProperties = GraphicalProperties(solidFill=chart_color)
+    volume_chart.series.append(Series(Reference(data_worksheet, min_col=volume_col, min_row=first_row,
+                                                max_col=volume_col, max_row=last_row), title="Volume"))
+    volume_chart.set_categories(labels)
+
+    # Prices on the right axis
+    price_chart = LineChart()
+    price_chart.y_axis.axId = 200
+    price_chart.y_axis.title = "Price"
+    price_chart.y_axis.crosses = "max"
+    for column, name in price_cols:
+        price_chart.series.append(Series(Reference(data_worksheet, min_col=column, min_row=first_row,
+                                                   max_col=column, max_row=last_row), title=name))
+    price_chart.set_categories(labels)
+
+    volume_chart += price_chart
+    return volume_chart
\ No newline at end of file
@@ -0,0 +1,162 @@
+# A module for the technical indicators of the prices: moving averages, average true range, Bollinger bands,
+# realized volatility and maximum drawdown.  Every indicator is calculated over the whole history at once with
+# running sums, so each one takes the same time no matter how long its window is.
+
+import numpy as np # Used for the running sums
+import pandas as pd # Used for returning the indicators by date
+
+from StockDashboardApplication.program_code.profiling import profiled
+
+# Trading days in a year, used to annualize the volatility
+TRADING_DAYS = 252
+
+# Days in each simple moving average shown on the dashboard
+SMA_WINDOWS = (20, 50, 200)
+
+# Days in the average true range
+ATR_WINDOW = 14
+
+# Days in the Bollinger bands' moving average, and how many standard deviations the bands are from it
+BOLLINGER_WINDOW = 20
+BOLLINGER_WIDTH = 2
+
+# Days of returns in the short-term realized volatility
+VOLATILITY_WINDOW = 20
+
+# Indicators drawn over the closing prices in the closing price chart
+OVERLAY_COLUMNS = ('SMA 50', 'SMA 200', 'Upper Band', 'Lower Band')
+
+# Mean of every window of values (NaN until a full window has been seen, or if the window has a missing value)
+def rolling_mean(values, window):
+    values = np.asarray(values, dtype=np.float64)
+    means = np.full(values.shape[0], np.nan)
+    if window < 1 or values.shape[0] < window:
+        return means
+
+    # Each window's sum is the difference of two running sums; missing values are counted instead of added
+    missing = np.isnan(values)
+    sums = np.concatenate(([0.0], np.cumsum(np.where(missing, 0.0, values))))
+    missing_counts = np.concatenate(([0], np.cumsum(missing)))
+    window_sums = sums[window:] - sums[:-window]
+    window_missing = missing_counts[window:] - missing_counts[:-window]
+    means[window - 1:] = np.where(window_missing == 0, window_sums / window, np.nan)
+    return means
+
+# Sample standard deviation of every window of values
+def rolling_std(values, window):
+    values = np.asarray(values, dtype=np.float64)
+    if window < 2:
+        return np.full(values.shape[0], np.nan)
+
+    # Shifting the values by their mean keeps the running sum of squares accurate for large prices
+    shifted = values - np.nanmean(values) if values.shape[0] > 0 and not np.isnan(values).all() else values
+    mean = rolling_mean(shifted, window)
+    mean_of_squares = rolling_mean(shifted ** 2, window)
+    variance = (mean_of_squares - mean ** 2) * window / (window - 1)
+    return np.sqrt(np.maximum(variance, 0.0))
+
+# Largest of each day's range and its gaps from the previous close
+def true_range(high, low, close):
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    previous_close = np.concatenate(([np.nan], np.asarray(close, dtype=np.float64)[:-1]))
+    ranges = np.vstack((high - low, np.abs(high - previous_close), np.abs(low - previous_close)))
+
+    # The first day has no previous close, so its range is only its high - low
+    return np.nanmax(ranges, axis=0) if ranges.shape[1] > 0 else high - low
+
+# Fall from the highest close so far on each day (0 at a new high, -0.25 when 25% below it)
+def drawdowns(close):
+    close = np.asarray(close, dtype=np.float64)
+    peaks = np.fmax.accumulate(close) if close.shape[0] > 0 else close
+    return close / peaks - 1
+
+# Calculates every indicator for each day of the prices
+@profiled('compute_indicators')
+def compute_indicators(df):
+    close = df['Close'].to_numpy(dtype=np.float64)
+    high = df['High'].to_numpy(dtype=np.float64)
+    low = df['Low'].to_numpy(dtype=np.float64)
+
+    indicators = pd.DataFrame({'Date': df['Date'].values})
+    for window in SMA_WINDOWS:
+        indicators[f'SMA {window}'] = rolling_mean(close, window)
+
+    band_middle = rolling_mean(close, BOLLINGER_WINDOW)
+    band_width = BOLLINGER_WIDTH * rolling_std(close, BOLLINGER_WINDOW)
+    indicators['Upper Band'] = band_middle + band_width
+    indicators['Lower Band'] = band_middle - band_width
+
+    indicators['ATR'] = rolling_mean(true_range(high, low, close), ATR_WINDOW)
+
+    # Daily log returns; the first day has none
+    returns = np.full(close.shape[0], np.nan)
+    if close.shape[0] > 1:
+        returns[1:] = np.log(close[1:] / close[:-1])
+    indicators['Volatility'] = rolling_std(returns, VOLATILITY_WINDOW) * np.sqrt(TRADING_DAYS)
+
+    indicators['Drawdown'] = drawdowns(close)
+    return indicators
+
+# Continues the highest close and the largest fall from it over the days of the prices after an earlier running
+# state (the summary of an earlier part of the history, see summarize_indicators).  Only a few days are usually
+# added, so they are gone through one at a time.  Returns the new highest close and maximum drawdown.
+def continue_drawdown(running_state, df):
+    new_days = df[df['Date'] > running_state['Date']]
+    close = new_days['Close'].to_numpy(dtype=np.float64)
+    highest_close, highest_date = running_state['Highest Close']
+    max_drawdown = running_state['Max Drawdown']
+    for i in range(close.shape[0]):
+        # Only a higher close or a larger fall counts, so the first day of a tie is kept like np.nanargmax does
+        if close[i] > highest_close:
+            highest_close, highest_date = float(close[i]), new_days['Date'].iloc[i]
+        elif close[i] / highest_close - 1 < max_drawdown[0]:
+            max_drawdown = (float(close[i] / highest_close - 1), highest_date, new_days['Date'].iloc[i])
+    return ((highest_close, highest_date), max_drawdown)
+
+# Summarizes the indicators as of the last day for the dashboard.  Returns a dictionary of the latest values,
+# with None for anything there is not enough history to calculate.  If the running state of an earlier part of
+# the history is given (the summary of it), the prices only need to hold the days the moving windows and the
+# yearly volatility use, and the highest close and maximum drawdown are continued from it.
+def summarize_indicators(df, indicators, running_state=None):
+    def latest(column):
+        value = indicators[column].iloc[-1] if indicators.shape[0] > 0 else np.nan
+        return None if pd.isna(value) else float(value)
+
+    summary = {'Date': df['Date'].iloc[-1] if df.shape[0] > 0 else None}
+    for column in [f'SMA {window}' for window in SMA_WINDOWS] + ['Upper Band', 'Lower Band', 'ATR', 'Volatility']:
+        summary[column] = latest(column)
+
+    # Volatility of the last year's returns
+    close = df['Close'].to_numpy(dtype=np.float64)[-(TRADING_DAYS + 1):]
+    returns = np.diff(np.log(close))
+    returns = returns[~np.isnan(returns)]
+    summary['Yearly Volatility'] = float(np.std(returns, ddof=1) * np.sqrt(TRADING_DAYS)) if returns.shape[0] > 1 else None
+
+    if running_state is not None:
+        summary['Highest Close'], summary['Max Drawdown'] = continue_drawdown(running_state, df)
+        return summary
+
+    # Highest close and largest fall from a high over the whole history, with the days it started and ended
+    summary['Highest Close'] = None
+    summary['Max Drawdown'] = None
+    drawdown = indicators['Drawdown'].to_numpy()
+    if drawdown.shape[0] > 0 and not np.isnan(drawdown).all():
+        close = df['Close'].to_numpy(dtype=np.float64)
+        highest = int(np.nanargmax(close))
+        summary['Highest Close'] = (float(close[highest]), df['Date'].iloc[highest])
+        trough = int(np.nanargmin(drawdown))
+        peak = int(np.nanargmax(close[:trough + 1]))
+        summary['Max Drawdown'] = (float(drawdown[trough]), df['Date'].iloc[peak], df['Date'].iloc[trough])
+    return summary
+
+# Adds the overlay indicators to a closing price table (which may only hold some of the days), matched by date.
+# A table that already has them (e.g. from an existing dashboard) keeps its own values for the days the
+# indicators could not be calculated for.
+def add_overlays(standard_stock_table, indicators):
+    overlays = indicators[['Date'] + list(OVERLAY_COLUMNS)]
+    table = standard_stock_table[['Date', 'Close']].merge(overlays, on='Date', how='left')
+    for column in OVERLAY_COLUMNS:
+        if column in standard_stock_table:
+            table[column] = table[column].fillna(standard_stock_table[column].reset_index(drop=True))
+    return table
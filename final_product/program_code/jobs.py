@@ -0,0 +1,54 @@
+# A module for sharing one dashboard build between identical requests made at the same time, so a dashboard
+# many people ask for at once is only downloaded and created once (the rate limiter shares API requests the same way)
+
+import threading # Used for sharing the builds between every thread
+from concurrent.futures import Future # Used for sharing one result between identical builds
+
+# Identifies a build by its ticker symbol, the days it covers and any options that change the result
+# (e.g. use_cache).  Requests made moments apart cover the same days, so only the dates are compared.
+def build_key(ticker_symbol, start_date, end_date, **options):
+    return (ticker_symbol.upper(), start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'),
+            tuple(sorted(options.items())))
+
+# Runs builds, letting a request for a build that is already running wait for that build's result
+# instead of starting another one
+class JobCoalescer:
+    # Constructor
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = {} # Builds currently running, by key
+        self.started = 0 # Builds that were run
+        self.shared = 0 # Requests that were given another build's result
+
+    # Runs function(*args) for the key, unless a build with the same key is already running, in which case its
+    # result (or exception) is shared.  Returns the result and whether it came from another request's build.
+    def run(self, key, function, *args):
+        with self.lock:
+            future = self.in_flight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self.in_flight[key] = future
+                self.started += 1
+            else:
+                self.shared += 1
+
+        # Another request is already running this build; wait for its result
+        if not is_owner:
+            return (future.result(), True)
+
+        try:
+            result = function(*args)
+            future.set_result(result)
+            return (result, False)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+
+    # Number of builds running, run and shared
+    def status(self):
+        with self.lock:
+            return {'running': len(self.in_flight), 'started': self.started, 'shared': self.shared}
@@ -1,5 +1,24 @@
 # A module for calculating the latest statistics, including those in categories valuation and financial health
 
+import numpy as np # Used for removing infinite values
+import pandas as pd # Used for calculating every report's statistics at once
+
+# Gets the given columns of a (typed) statement as floats, with missing values or columns as NaN
+def numeric_columns(statement, columns):
+    return statement.reindex(columns=columns).astype('float64')
+
+# Gets the fiscal date ending of every report, used to label each row of the calculations
+def report_dates(statement):
+    if 'fiscalDateEnding' in statement:
+        return pd.Index(statement['fiscalDateEnding'], name='fiscalDateEnding')
+    return statement.index
+
+# Gets the most recent value of a calculation, or None if it could not be calculated
+def latest(series):
+    if len(series) == 0 or np.isnan(series.iloc[0]):
+        return None
+    return float(series.iloc[0])
+
 # A class that deals with calculations such as quick and current ratios
 class FinancialHealth:
     # Constructor
@@ -7,36 +26,35 @@ class FinancialHealth:
         self.balance_sheet = balance_sheet
         self.income_statement = income_statement
 
+        # Every report's ratios, calculated at once (newest report first, like the statements)
+        self.ratios = self.ratio_history()
+
+    # Calculates the quick, current and debt-to-equity ratios of every report
+    def ratio_history(self):
+        values = numeric_columns(self.balance_sheet, ['totalCurrentAssets', 'inventory', 'totalCurrentLiabilities',
+                                                      'totalLiabilities', 'totalShareholderEquity'])
+
+        ratios = pd.DataFrame({
+            'Quick Ratio': (values['totalCurrentAssets'] - values['inventory']) / values['totalCurrentLiabilities'],
+            'Current Ratio': values['totalCurrentAssets'] / values['totalCurrentLiabilities'],
+            'Debt-to-Equity': values['totalLiabilities'] / values['totalShareholderEquity']
+        })
+        ratios.index = report_dates(self.balance_sheet)
+
+        # Dividing by zero cannot be calculated
+        return ratios.replace([np.inf, -np.inf], np.nan)
+
     # Calculates the quick ratio
     def quick_ratio(self):
-        try:
-            current_assets = int(self.balance_sheet.at[0, 'totalCurrentAssets'])
-            inventory = int(self.balance_sheet.at[0, 'inventory'])
-            current_liabilities = int(self.balance_sheet.at[0, 'totalCurrentLiabilities'])
-
-            return (current_assets - inventory) / current_liabilities
-        except:
-            return None
+        return latest(self.ratios['Quick Ratio'])
 
     # Calculates the current ratio
     def current_ratio(self):
-        try:
-            current_assets = int(self.balance_sheet.at[0, 'totalCurrentAssets'])
-            current_liabilities = int(self.balance_sheet.at[0, 'totalCurrentLiabilities'])
-
-            return current_assets / current_liabilities
-        except:
-            return None
+        return latest(self.ratios['Current Ratio'])
 
     # Calculates the debt-to-equity ratio
     def debt_to_equity(self):
-        try:
-            liabilities = int(self.balance_sheet.at[0, 'totalLiabilities'])
-            shareholders_equity = int(self.balance_sheet.at[0, 'totalShareholderEquity'])
-
-            return liabilities / shareholders_equity
-        except:
-            return None
+        return latest(self.ratios['Debt-to-Equity'])
 
 
 # Growth statistics, including revenue decrease/ increase
@@ -45,38 +63,29 @@ class Growth:
     def __init__(self, income_statement):
         self.income_statement = income_statement
 
-    # Calculate the revenue growth
-    def revenue_growth(self):
-        try:
-            current_total_revenue = int(self.income_statement.at[0, 'totalRevenue'])
-            current_cost_of_revenue = int(self.income_statement.at[0, 'costOfRevenue'])
-            previous_total_revenue = int(self.income_statement.at[1, 'totalRevenue'])
-            previous_cost_of_revenue = int(self.income_statement.at[1, 'costOfRevenue'])
+        # Every report's growth, calculated at once (newest report first, like the statements)
+        self.growth = self.growth_history()
 
-            current_revenue = current_total_revenue - current_cost_of_revenue
-            previous_revenue = previous_total_revenue - previous_cost_of_revenue
+    # Calculates the growth of every report compared to the report before it (the next row)
+    def growth_history(self):
+        values = numeric_columns(self.income_statement, ['totalRevenue', 'operatingIncome', 'netIncome'])
+        previous_values = values.shift(-1)
 
-            #return ((current_revenue - previous_revenue) / previous_revenue) * 100
-            return ((current_total_revenue - previous_total_revenue) / previous_total_revenue) * 100
-        except:
-            return None
+        growth = ((values - previous_values) / previous_values) * 100
+        growth.columns = ['Revenue Growth', 'Operating Income Growth', 'Net Income Growth']
+        growth.index = report_dates(self.income_statement)
+
+        # Dividing by zero cannot be calculated
+        return growth.replace([np.inf, -np.inf], np.nan)
+
+    # Calculate the revenue growth
+    def revenue_growth(self):
+        return latest(self.growth['Revenue Growth'])
 
     # Calcuate the operating income growth
     def operating_income_growth(self):
-        try:
-            current_operating_income = int(self.income_statement.at[0, 'operatingIncome'])
-            previous_operating_income = int(self.income_statement.at[1, 'operatingIncome'])
-
-            return ((current_operating_income - previous_operating_income) / previous_operating_income) * 100
-        except:
-            return None
+        return latest(self.growth['Operating Income Growth'])
 
     # Calcuate the net income growth
     def net_income_growth(self):
-        try:
-            current_net_income = int(self.income_statement.at[0, 'netIncome'])
-            previous_net_income = int(self.income_statement.at[1, 'netIncome'])
-
-            return ((current_net_income - previous_net_income) / previous_net_income) * 100
-        except:
-            return None
\ No newline at end of file
+        return latest(self.growth['Net Income Growth'])
\ No newline at end of file
@@ -0,0 +1,124 @@
+# A module for keeping daily prices on disk as one NumPy file per column, so any range of days can be read
+# straight from the files without parsing or copying them.
+# Import an archive with "python -m StockDashboardApplication.program_code.local_store STORE_DIR AAPL prices.csv"
+
+import argparse # Used for reading the command line arguments
+import json # Used for storing the statements
+import os # Used for building file paths
+import sys # Used for the exit code
+
+import numpy as np # Used for the memory-mapped column files
+import pandas as pd # Used for combining and returning the prices
+
+from StockDashboardApplication.program_code.data_cache import replace_file
+from StockDashboardApplication.program_code.profiling import profiled
+
+# Columns of the prices in the order yahoo sends them, with the file each one is kept in
+PRICE_FILES = {
+    'High': 'high.npy',
+    'Low': 'low.npy',
+    'Open': 'open.npy',
+    'Close': 'close.npy',
+    'Volume': 'volume.npy',
+    'Adj Close': 'adj_close.npy'
+}
+
+# File holding the trading days, sorted from oldest to newest
+DATE_FILE = 'date.npy'
+
+# Gets the folder of a ticker symbol in the store
+def get_store_dir(store_dir, ticker_symbol):
+    return os.path.join(store_dir, ticker_symbol.upper())
+
+# Checks if the store has prices for a ticker symbol
+def has_prices(store_dir, ticker_symbol):
+    return os.path.exists(os.path.join(get_store_dir(store_dir, ticker_symbol), DATE_FILE))
+
+# Gets the prices between the start and end dates (inclusive, or every day if not given), indexed by date like
+# yahoo's prices.  Every column is a slice of a memory-mapped file, so only the days that are used are ever read
+# from disk.
+@profiled('read_local_prices')
+def read_prices(store_dir, ticker_symbol, start_date=None, end_date=None):
+    ticker_dir = get_store_dir(store_dir, ticker_symbol)
+    dates = np.load(os.path.join(ticker_dir, DATE_FILE), mmap_mode='r')
+
+    # The days are sorted, so the range is found with two binary searches
+    first = 0
+    last = dates.shape[0]
+    if start_date is not None:
+        first = np.searchsorted(dates, np.datetime64(pd.Timestamp(start_date).normalize(), 'ns'), side='left')
+    if end_date is not None:
+        last = np.searchsorted(dates, np.datetime64(pd.Timestamp(end_date).normalize(), 'ns'), side='right')
+
+    columns = {name: np.load(os.path.join(ticker_dir, file_name), mmap_mode='r')[first:last]
+               for name, file_name in PRICE_FILES.items()}
+    return pd.DataFrame(columns, index=pd.DatetimeIndex(dates[first:last], name='Date'), copy=False)
+
+# Writes a column to the store all at once
+def save_column(path, values):
+    def write(temp_path):
+        with open(temp_path, 'wb') as f:
+            np.save(f, values)
+    replace_file(path, write)
+
+# Adds prices (indexed by date, e.g. from yahoo or an archive) to the store, replacing any days already in it
+def write_prices(store_dir, ticker_symbol, prices):
+    ticker_dir = get_store_dir(store_dir, ticker_symbol)
+    os.makedirs(ticker_dir, exist_ok=True)
+
+    prices = prices.reindex(columns=list(PRICE_FILES))
+    prices.index = pd.DatetimeIndex(prices.index, name='Date').astype('datetime64[ns]')
+    if has_prices(store_dir, ticker_symbol):
+        prices = pd.concat([read_prices(store_dir, ticker_symbol), prices])
+    prices = prices[~prices.index.duplicated(keep='last')].sort_index()
+
+    # The dates are written last, so when only newer days are appended a reader never sees days without their
+    # prices.  Adding or replacing older days moves every later day to a new row, so a reader running at the same
+    # time may pair dates with the wrong prices; only do that while nothing is reading the store.
+    for name, file_name in PRICE_FILES.items():
+        save_column(os.path.join(ticker_dir, file_name), prices[name].to_numpy(dtype=np.float64))
+    save_column(os.path.join(ticker_dir, DATE_FILE), prices.index.to_numpy(dtype='datetime64[ns]'))
+    return prices.shape[0]
+
+# Gets a statement (e.g. 'INCOME_STATEMENT') from the store, or None if it has not been added
+def read_statement(store_dir, function, ticker_symbol):
+    path = os.path.join(get_store_dir(store_dir, ticker_symbol), f'{function}.json')
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+# Adds a statement (alpha vantage's JSon) to the store
+def write_statement(store_dir, function, ticker_symbol, data):
+    ticker_dir = get_store_dir(store_dir, ticker_symbol)
+    os.makedirs(ticker_dir, exist_ok=True)
+
+    def write(temp_path):
+        with open(temp_path, 'w') as f:
+            json.dump(data, f)
+    replace_file(os.path.join(ticker_dir, f'{function}.json'), write)
+
+# Reads the command line arguments and imports a ticker symbol's prices (and statements) into the store
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Import daily prices and statements into the local store.')
+    parser.add_argument('store', help='folder of the local store')
+    parser.add_argument('ticker', help='ticker symbol the data belongs to')
+    parser.add_argument('prices', help='CSV file with a Date column and High, Low, Open, Close, Volume (and Adj Close)')
+    parser.add_argument('--income-statement', help='alpha vantage income statement (JSon) to add')
+    parser.add_argument('--balance-sheet', help='alpha vantage balance sheet (JSon) to add')
+    args = parser.parse_args(argv)
+
+    prices = pd.read_csv(args.prices, index_col='Date', parse_dates=['Date'])
+    if 'Adj Close' not in prices:
+        prices['Adj Close'] = prices['Close']
+    rows = write_prices(args.store, args.ticker, prices)
+    print(f'{args.ticker.upper()} now has {rows} trading days in {args.store}.')
+
+    for function, path in (('INCOME_STATEMENT', args.income_statement), ('BALANCE_SHEET', args.balance_sheet)):
+        if path is not None:
+            with open(path) as f:
+                write_statement(args.store, function, args.ticker, json.load(f))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,152 @@
+# A module for writing the tables of a large workbook in worker processes.  Each table's rows are turned into
+# worksheet XML by a worker while this process builds the dashboard; the finished rows are put into their sheets
+# just before the workbook is saved, so saving the zip file is all that is left to do at the end.
+# Only workbooks with at least PARALLEL_MIN_ROWS days of prices are split up, since starting the work in another
+# process takes longer than writing a small table.
+
+import os # Used for finding the number of processors
+import re # Used for renumbering the styles of the rows
+from concurrent.futures import ProcessPoolExecutor # Used for the worker processes
+
+import openpyxl # Used for writing each table's rows
+from openpyxl.styles.cell_style import StyleArray # Used for adding the rows' styles to the workbook
+from openpyxl.styles.numbers import BUILTIN_FORMATS, BUILTIN_FORMATS_MAX_SIZE, BUILTIN_FORMATS_REVERSE
+
+from StockDashboardApplication.program_code.profiling import profiled
+
+# Fewest days of prices for the tables to be written by worker processes
+PARALLEL_MIN_ROWS = 2500
+
+# Number of worker processes writing tables, unless another number is given
+SHEET_WORKERS = min(4, os.cpu_count() or 1)
+
+# Style of a cell in the worksheet XML, e.g. <c r="A2" s="1" t="n">
+STYLE_PATTERN = re.compile(rb' s="(\d+)"')
+
+# Worker processes kept running between workbooks, by number of workers
+sheet_pools = {}
+
+# Whether this version of openpyxl has the parts the workers' rows are put into the workbook through (None until
+# checked).  They are not public (each streamed sheet's temporary file and the workbook's styles and number
+# formats), so a newer openpyxl may not have them.
+openpyxl_supported = None
+
+# Checks that openpyxl has every part of a streamed workbook that is used here
+def check_openpyxl():
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(['Date'])
+    ws.close()
+    writer = getattr(ws, '_writer', None)
+    supported = writer is not None and isinstance(getattr(writer, 'out', None), str) and hasattr(writer, 'cleanup')
+    if supported:
+        writer.cleanup()
+    for name in ('_cell_styles', '_number_formats'):
+        supported = supported and hasattr(getattr(wb, name, None), 'add')
+    return supported
+
+# Gets the worker processes (SHEET_WORKERS unless another number is given, but never more than the number of
+# processors), starting them the first time they are needed.  Returns None if that leaves fewer than two workers,
+# since they would only slow this process down, or if this version of openpyxl cannot take their rows; the tables
+# are then written in this process.
+def get_sheet_pool(workers=None):
+    global openpyxl_supported
+    workers = min(workers or SHEET_WORKERS, os.cpu_count() or 1)
+    if workers < 2:
+        return None
+    if openpyxl_supported is None:
+        openpyxl_supported = check_openpyxl()
+    if not openpyxl_supported:
+        return None
+    if workers not in sheet_pools:
+        sheet_pools[workers] = ProcessPoolExecutor(max_workers=workers)
+    return sheet_pools[workers]
+
+# Gets the number format of every style in a workbook (only the number formats of the tables' cells are set,
+# e.g. for dates; their fonts, fills and borders are the defaults)
+def style_formats(wb):
+    formats = []
+    for style in wb._cell_styles:
+        if style.numFmtId < BUILTIN_FORMATS_MAX_SIZE:
+            formats.append((tuple(style), BUILTIN_FORMATS.get(style.numFmtId, 'General')))
+        else:
+            formats.append((tuple(style), wb._number_formats[style.numFmtId - BUILTIN_FORMATS_MAX_SIZE]))
+    return formats
+
+# Gets the rows of a sheet's XML (everything in <sheetData>)
+def sheet_data(xml):
+    start = xml.index(b'<sheetData')
+    end = xml.index(b'</sheetData>') + len(b'</sheetData>')
+    return (xml[:start], xml[start:end], xml[end:])
+
+# Writes the header and rows of a table as worksheet XML in a worker process.
+# Returns the XML of the rows and the styles they use.
+def serialize_table(table, header):
+    from StockDashboardApplication.program_code.dashboard import stream_rows
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(header)
+    stream_rows(ws, table)
+    ws.close()
+    try:
+        with open(ws._writer.out, 'rb') as f:
+            rows = sheet_data(f.read())[1]
+    finally:
+        ws._writer.cleanup()
+    return (rows, style_formats(wb))
+
+# Adds the styles used by rows written in a worker process to the workbook.
+# Returns the style number in the workbook of each of the worker's style numbers.
+def add_styles(wb, formats):
+    style_ids = {}
+    for worker_id, (values, number_format) in enumerate(formats):
+        style = StyleArray(values)
+        if number_format in BUILTIN_FORMATS_REVERSE:
+            style.numFmtId = BUILTIN_FORMATS_REVERSE[number_format]
+        else:
+            style.numFmtId = wb._number_formats.add(number_format) + BUILTIN_FORMATS_MAX_SIZE
+        style_ids[worker_id] = wb._cell_styles.add(style)
+    return style_ids
+
+# Writes the tables of one workbook in the worker processes.  Each table is submitted as soon as it is known;
+# make_pivot_table then only writes the sheet's header, and finish() puts the rows written by the worker into
+# the sheet before the workbook is saved.
+class SheetWriter:
+    # Constructor
+    def __init__(self, pool):
+        self.pool = pool
+        self.futures = {} # Rows being written, by sheet name
+        self.sheets = [] # Sheets waiting for their rows
+
+    # Starts writing the rows of a table in a worker process
+    def submit(self, name, table, header):
+        self.futures[name] = self.pool.submit(serialize_table, table, header)
+
+    # Checks if the rows of a sheet are being written by a worker process
+    def has_sheet(self, name):
+        return name in self.futures
+
+    # Remembers a sheet whose rows are being written by a worker process
+    def add(self, ws):
+        self.sheets.append(ws)
+
+    # Puts the rows written by the worker processes into their sheets.  The sheets are finished here, so this must
+    # be called once everything else (e.g. charts) has been added to them, right before the workbook is saved.
+    @profiled('finish_sheets')
+    def finish(self, wb):
+        for ws in self.sheets:
+            rows, formats = self.futures[ws.title].result()
+
+            # The worker numbered its styles on its own; use the workbook's numbers instead
+            style_ids = add_styles(wb, formats)
+            if any(worker_id != style_id for worker_id, style_id in style_ids.items()):
+                rows = STYLE_PATTERN.sub(lambda match: b' s="%d"' % style_ids[int(match.group(1))], rows)
+
+            # Replace the header this process wrote with every row
+            ws.close()
+            with open(ws._writer.out, 'rb') as f:
+                top, header, tail = sheet_data(f.read())
+            with open(ws._writer.out, 'wb') as f:
+                f.write(top + rows + tail)
+        self.sheets = []
@@ -0,0 +1,194 @@
+# A module for recording how long each stage of making a dashboard takes, how much it downloaded and how much
+# memory it used.  Nothing is recorded unless a Profiler is active (e.g. with --profile).
+
+import cProfile # Used for the optional profile of the slowest part of making a dashboard
+import functools # Used for keeping the names of the profiled functions
+import json # Used for writing each ticker symbol's record
+import os # Used for building file paths
+import threading # Used for keeping each thread's profiler separate
+import time # Used for timing each stage
+import tracemalloc # Used for finding the peak memory of each stage
+from contextlib import contextmanager # Used for profiling blocks of code
+
+try:
+    import resource # Used for the peak memory of the whole process (not available on Windows)
+except ImportError:
+    resource = None
+
+# File each ticker symbol's record is added to, one JSon object per line
+PROFILE_LOG = 'dashboard_profile.jsonl'
+
+# The profiler of the ticker symbol each thread is working on
+_current = threading.local()
+
+# Shared between every thread adding to a profiler
+_lock = threading.Lock()
+
+# Records every stage of making one ticker symbol's dashboard
+class Profiler:
+    # Constructor
+    def __init__(self, ticker_symbol, trace_memory=False, cprofile_dir=None):
+        self.ticker_symbol = ticker_symbol
+        self.trace_memory = trace_memory
+        self.cprofile_dir = cprofile_dir
+        self.started = time.time()
+        self.bytes_fetched = 0
+        self.stages = {} # Calls, wall time, CPU time and peak memory of each stage, by name
+
+    # Records one run of a stage.  Times include any stages run inside it.
+    @contextmanager
+    def stage(self, name):
+        # Each running stage keeps its starting memory and the highest peak of the stages run inside it
+        stack = get_stage_stack()
+        memory = [0, 0]
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            memory[0] = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        stack.append(memory)
+
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.thread_time() - cpu_start
+            stack.pop()
+
+            peak = None
+            if self.trace_memory:
+                # Stages run inside this one reset the peak, so theirs are passed up through the stack
+                peak = max(tracemalloc.get_traced_memory()[1], memory[1])
+                if len(stack) > 0:
+                    stack[-1][1] = max(stack[-1][1], peak)
+                peak -= memory[0]
+
+            with _lock:
+                entry = self.stages.setdefault(name, {'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0})
+                entry['calls'] += 1
+                entry['wall_seconds'] += wall
+                entry['cpu_seconds'] += cpu
+                if peak is not None:
+                    entry['peak_alloc_bytes'] = max(entry.get('peak_alloc_bytes', 0), peak)
+
+    # Adds to the number of bytes downloaded
+    def add_bytes(self, count):
+        with _lock:
+            self.bytes_fetched += count
+
+    # Everything recorded, as a dictionary that can be written as JSon
+    def record(self):
+        peak_rss = None
+        if resource is not None:
+            # Kilobytes on Linux
+            peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        return {
+            'ticker': self.ticker_symbol,
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            'wall_seconds': time.time() - self.started,
+            'bytes_fetched': self.bytes_fetched,
+            'peak_rss_bytes': peak_rss,
+            'stages': self.stages
+        }
+
+    # Adds the record to the end of the log
+    def write_record(self, log_path=PROFILE_LOG):
+        with _lock:
+            with open(log_path, 'a') as f:
+                f.write(json.dumps(self.record()) + '\n')
+
+    # Prints the time of each stage, slowest first
+    def print_summary(self):
+        record = self.record()
+        print(f"Profile of {record['ticker']}: {record['wall_seconds']:.2f}s, {record['bytes_fetched']:,} bytes fetched")
+        for name, entry in sorted(self.stages.items(), key=lambda item: -item[1]['wall_seconds']):
+            line = f"    {name:<20}{entry['calls']:>4}x {entry['wall_seconds'] * 1000:>10.1f} ms wall {entry['cpu_seconds'] * 1000:>10.1f} ms cpu"
+            if 'peak_alloc_bytes' in entry:
+                line += f" {entry['peak_alloc_bytes'] / 2 ** 20:>8.1f} MiB peak"
+            print(line)
+
+# Stack of the stages running on this thread
+def get_stage_stack():
+    if not hasattr(_current, 'stack'):
+        _current.stack = []
+    return _current.stack
+
+# The profiler active on this thread, or None
+def get_profiler():
+    return getattr(_current, 'profiler', None)
+
+# Makes a profiler active on this thread while the block runs
+@contextmanager
+def profiling(profiler):
+    previous = get_profiler()
+    _current.profiler = profiler
+    try:
+        yield profiler
+    finally:
+        _current.profiler = previous
+
+# Records a block of code as a stage of the active profiler (if there is one)
+@contextmanager
+def stage(name):
+    profiler = get_profiler()
+    if profiler is None:
+        yield
+        return
+    with profiler.stage(name):
+        yield
+
+# Records every call to a function as a stage.  With hot_path, the calls are also profiled with cProfile when
+# the profiler has a folder to save the results in.
+def profiled(name, hot_path=False):
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            profiler = get_profiler()
+            if profiler is None:
+                return function(*args, **kwargs)
+
+            with profiler.stage(name):
+                if not hot_path or profiler.cprofile_dir is None:
+                    return function(*args, **kwargs)
+                python_profile = cProfile.Profile()
+                try:
+                    return python_profile.runcall(function, *args, **kwargs)
+                finally:
+                    python_profile.dump_stats(os.path.join(profiler.cprofile_dir, f'{profiler.ticker_symbol}_{name}.prof'))
+        return wrapper
+    return decorator
+
+# Wraps a function that will run on another thread so it adds to this thread's profiler
+def in_thread(function):
+    profiler = get_profiler()
+    if profiler is None:
+        return function
+
+    def run(*args, **kwargs):
+        with profiling(profiler):
+            return function(*args, **kwargs)
+    return run
+
+# Adds the size of a downloaded response to the active profiler (used as a requests response hook)
+def count_response(response, *args, **kwargs):
+    profiler = get_profiler()
+    if profiler is not None:
+        profiler.add_bytes(len(response.content))
+    return response
+
+# Adds the profiling options to a command line parser
+def add_profile_arguments(parser):
+    parser.add_argument('--profile', action='store_true',
+                        help=f'record the time of each stage and add it to {PROFILE_LOG}')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='also record the peak memory of each stage (slower)')
+    parser.add_argument('--cprofile', action='store_true',
+                        help='also save a cProfile of building each workbook next to the log')
+
+# Creates a profiler for a ticker symbol from the command line options, or None if profiling is off
+def make_profiler(ticker_symbol, args, log_dir='.'):
+    if not (args.profile or args.profile_memory or args.cprofile):
+        return None
+    return Profiler(ticker_symbol, args.profile_memory, log_dir if args.cprofile else None)
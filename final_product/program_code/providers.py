@@ -0,0 +1,83 @@
+# A module for choosing where the prices and statements come from: yahoo and alpha vantage, or a local store
+
+from abc import ABC, abstractmethod # Used for making every provider get its own prices and statements
+
+from StockDashboardApplication.program_code import data_cache
+from StockDashboardApplication.program_code import data_sources
+from StockDashboardApplication.program_code import local_store
+
+# Statements every dashboard needs
+STATEMENTS = ('INCOME_STATEMENT', 'BALANCE_SHEET')
+
+# Where the prices and statements of a dashboard come from.  Every provider returns the prices indexed by date
+# (in the same columns as yahoo) and the statements as alpha vantage's JSon.
+class DataProvider(ABC):
+    # Gets the daily prices between the start and end dates
+    @abstractmethod
+    def get_prices(self, ticker_symbol, start_date, end_date, use_cache=True):
+        pass
+
+    # Gets a statement (e.g. 'INCOME_STATEMENT')
+    @abstractmethod
+    def get_statement(self, function, ticker_symbol, use_cache=True):
+        pass
+
+    # Gets the prices, income statement and balance sheet
+    def get_all(self, ticker_symbol, start_date, end_date, use_cache=True):
+        prices = self.get_prices(ticker_symbol, start_date, end_date, use_cache)
+        income_statement = self.get_statement(STATEMENTS[0], ticker_symbol, use_cache)
+        balance_sheet = self.get_statement(STATEMENTS[1], ticker_symbol, use_cache)
+        return (prices, income_statement, balance_sheet)
+
+# Downloads the prices from yahoo and the statements from alpha vantage (from the cache when possible)
+class OnlineProvider(DataProvider):
+    # Constructor
+    def __init__(self, api_key):
+        self.api_key = api_key
+
+    # Gets the daily prices between the start and end dates
+    def get_prices(self, ticker_symbol, start_date, end_date, use_cache=True):
+        if use_cache:
+            return data_cache.get_prices(ticker_symbol, start_date, end_date, data_sources.fetch_prices)
+        return data_sources.fetch_prices(ticker_symbol, start_date, end_date)
+
+    # Gets a statement (e.g. 'INCOME_STATEMENT')
+    def get_statement(self, function, ticker_symbol, use_cache=True):
+        if use_cache:
+            return data_cache.get_statement(function, ticker_symbol, self.api_key, data_sources.fetch_statement)
+        return data_sources.fetch_statement(function, ticker_symbol, self.api_key)
+
+    # Gets the prices, income statement and balance sheet, all downloaded at the same time
+    def get_all(self, ticker_symbol, start_date, end_date, use_cache=True):
+        return data_sources.fetch_all(ticker_symbol, start_date, end_date, self.api_key, use_cache)
+
+# Reads the prices (and statements, if they have been added) from a local store of NumPy files.
+# Statements missing from the store come from statements_provider, if one is given.
+class LocalStoreProvider(DataProvider):
+    # Constructor
+    def __init__(self, store_dir, statements_provider=None):
+        self.store_dir = store_dir
+        self.statements_provider = statements_provider
+
+    # Gets the daily prices between the start and end dates (nothing is downloaded, so there is nothing to cache)
+    def get_prices(self, ticker_symbol, start_date, end_date, use_cache=True):
+        if not local_store.has_prices(self.store_dir, ticker_symbol):
+            raise KeyError(f"'{ticker_symbol}' has no prices in the local store {self.store_dir}")
+        return local_store.read_prices(self.store_dir, ticker_symbol, start_date, end_date)
+
+    # Gets a statement (e.g. 'INCOME_STATEMENT')
+    def get_statement(self, function, ticker_symbol, use_cache=True):
+        data = local_store.read_statement(self.store_dir, function, ticker_symbol)
+        if data is None:
+            if self.statements_provider is None:
+                raise KeyError(f"'{ticker_symbol}' has no {function} in the local store {self.store_dir}")
+            data = self.statements_provider.get_statement(function, ticker_symbol, use_cache)
+        return data
+
+# Creates the provider chosen on the command line: the local store if --store was given, otherwise yahoo and
+# alpha vantage
+def make_provider(api_key, store_dir=None):
+    online_provider = OnlineProvider(api_key)
+    if store_dir is None:
+        return online_provider
+    return LocalStoreProvider(store_dir, online_provider)
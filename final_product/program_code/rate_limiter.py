@@ -0,0 +1,123 @@
+# A module for keeping requests within an API's calls-per-minute and calls-per-day limits
+
+import threading # Used for sharing the limits between every thread
+import time # Used for waiting until a call is allowed
+from collections import deque # Used for remembering when the most recent calls were made
+
+from StockDashboardApplication.program_code.jobs import JobCoalescer
+from StockDashboardApplication.program_code.profiling import stage
+
+# Raised when a request cannot be made without going over the limits
+class RateLimitError(Exception):
+    pass
+
+# A bucket that allows a number of calls per period, refilling continuously
+class TokenBucket:
+    # Constructor
+    def __init__(self, calls, period, capacity=None):
+        self.rate = calls / period
+        self.capacity = calls if capacity is None else capacity
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    # Adds the tokens earned since the last update
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    # Number of seconds until a call is allowed
+    def wait_time(self):
+        self.refill()
+        return 0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    # Uses up one call
+    def take(self):
+        self.tokens -= 1
+
+    # Stops every call for a number of seconds (e.g. after the API said the limit was reached)
+    def drain(self, seconds):
+        self.refill()
+        self.tokens = min(self.tokens, 1 - self.rate * seconds)
+
+# Allows a number of calls within any window of time (e.g. 5 calls in any 60 seconds), so short bursts are
+# allowed without ever going over the limit
+class SlidingWindow:
+    # Constructor
+    def __init__(self, calls, period):
+        self.calls = calls
+        self.period = period
+        self.call_times = deque()
+        self.blocked_until = 0
+
+    # Number of seconds until a call is allowed
+    def wait_time(self):
+        now = time.monotonic()
+        while len(self.call_times) > 0 and self.call_times[0] <= now - self.period:
+            self.call_times.popleft()
+
+        wait = max(0, self.blocked_until - now)
+        if len(self.call_times) >= self.calls:
+            wait = max(wait, self.call_times[0] + self.period - now)
+        return wait
+
+    # Uses up one call
+    def take(self):
+        self.call_times.append(time.monotonic())
+
+    # Stops every call for a number of seconds (e.g. after the API said the limit was reached)
+    def drain(self, seconds):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+# Schedules the requests of every ticker symbol so the API's limits are never reached
+class RequestScheduler:
+    # Constructor
+    def __init__(self, calls_per_minute, calls_per_day, max_wait=5 * 60, max_retries=3):
+        # No 60 second window may ever hold too many calls, so the minute limit is tracked exactly
+        self.minute_window = SlidingWindow(calls_per_minute, 60)
+        self.day_bucket = TokenBucket(calls_per_day, 24 * 60 * 60)
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+
+        self.lock = threading.Lock()
+        self.jobs = JobCoalescer() # Requests currently being made, shared between identical requests
+
+    # Waits until a call is allowed by both buckets, then uses it up
+    def acquire(self):
+        while True:
+            with self.lock:
+                wait = max(self.minute_window.wait_time(), self.day_bucket.wait_time())
+                if wait == 0:
+                    self.minute_window.take()
+                    self.day_bucket.take()
+                    return
+            if wait > self.max_wait:
+                raise RateLimitError(f'The API call limit has been reached; next call allowed in {wait:.0f} seconds.')
+            with stage('rate_limit_wait'):
+                time.sleep(wait)
+
+    # Makes a request, sharing the result with identical requests (same key) that are made at the same time
+    def request(self, key, refused_limit, function, *args):
+        return self.jobs.run(key, self.make_request, refused_limit, function, *args)[0]
+
+    # Makes a request within the limits.  refused_limit says which limit ('minute' or 'day') the API refused a
+    # response for, or None if it was not refused.  Responses refused for the minute limit are tried again after
+    # the window has passed; the day limit will not reset for hours, so no call is allowed until it does and
+    # RateLimitError is raised right away.
+    def make_request(self, refused_limit, function, *args):
+        for attempt in range(self.max_retries + 1):
+            self.acquire()
+            result = function(*args)
+            limit = refused_limit(result)
+            if limit is None:
+                return result
+
+            if limit == 'day':
+                with self.lock:
+                    self.day_bucket.drain(24 * 60 * 60)
+                raise RateLimitError('The API refused the request because its daily call limit has been reached.')
+
+            # Refused by the API; stop every queued request until the window has passed
+            with self.lock:
+                self.minute_window.drain(60)
+        raise RateLimitError(f'The API refused the request {self.max_retries + 1} times because of its call limit.')
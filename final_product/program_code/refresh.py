@@ -0,0 +1,216 @@
+# A module for bringing an existing dashboard up to date, only adding the trading days since it was last updated.
+# The saved dashboard is never loaded into openpyxl: the rows of the stock data and summaries that have not changed
+# are copied into the refreshed file byte for byte (see workbook_parts.py), and only the new rows, the dashboard,
+# its chart tables and the statements are written again.  Only the last days of the stock data are read back; the
+# statistics of the whole history are continued from the running state kept in the dashboard.
+
+import argparse # Used for reading the command line arguments
+import datetime # Used for finding the days that are missing from the dashboard
+import io # Used for creating the new parts of the dashboard in memory
+import sys # Used for the exit code
+
+import pandas as pd # Used for reading the tables back into dataframes
+
+from StockDashboardApplication.program_code.main import API_KEY, get_date_range
+from StockDashboardApplication.program_code.dashboard import add_pivot_tables
+from StockDashboardApplication.program_code.dashboard_model import build_model, read_running_state, \
+    RUNNING_STATE_SHEET
+from StockDashboardApplication.program_code.providers import make_provider
+from StockDashboardApplication.program_code.statements import parse_reports, STATEMENT_SCHEMA
+from StockDashboardApplication.program_code.downsampling import RECENT_DAYS, OHLC_PERIODS, ohlc_period
+from StockDashboardApplication.program_code.indicators import SMA_WINDOWS, TRADING_DAYS
+from StockDashboardApplication.program_code.aggregations import SUMMARY_COLUMNS
+from StockDashboardApplication.program_code.workbook_parts import SavedWorkbook, read_parts, write_parts, \
+    sheet_paths, cell_styles, splice_rows
+
+# Sheets holding the statements, with the statement and reports each one is made from
+STATEMENT_SHEETS = (
+    ('Quarterly Income Statement Data', 'INCOME_STATEMENT', 'quarterlyReports'),
+    ('Quarterly Balance Sheet Data', 'BALANCE_SHEET', 'quarterlyReports'),
+    ('Annual Income Statement Data', 'INCOME_STATEMENT', 'annualReports'),
+    ('Annual Balance Sheet Data', 'BALANCE_SHEET', 'annualReports')
+)
+
+# Sheets holding the calendar summaries, by period
+SUMMARY_SHEETS = ('Weekly', 'Monthly', 'Quarterly', 'Yearly')
+
+# Trading days before the new ones the indicators of the last day need: a year of returns, which also covers the
+# longest moving average of the closing chart's most recent days
+HISTORY_DAYS = max(TRADING_DAYS + 1, max(SMA_WINDOWS) + RECENT_DAYS)
+
+# Reads the rows of a table's sheet (from start_row on) into a dataframe
+def read_table(saved_workbook, name, start_row=2):
+    header = saved_workbook.rows(name, 1, 1)[0]
+    rows = [(row + [None] * len(header))[:len(header)] for row in saved_workbook.rows(name, start_row)]
+    return pd.DataFrame(rows, columns=header)
+
+# Reads a statement's sheet back into a dataframe with the same column types as parse_reports
+def read_statement(saved_workbook, name):
+    statement = read_table(saved_workbook, name)
+    for column in statement.columns:
+        kind = STATEMENT_SCHEMA.get(column, 'number')
+        if kind == 'date':
+            statement[column] = pd.to_datetime(statement[column], errors='coerce')
+        elif kind == 'number':
+            statement[column] = pd.to_numeric(statement[column], errors='coerce')
+    return statement
+
+# Reads the stock data from start_row on, followed by the new prices
+def read_history(saved_workbook, new_prices, start_row=2):
+    history = pd.concat([read_table(saved_workbook, 'Stock Data', start_row), new_prices], ignore_index=True)
+    history['Date'] = pd.to_datetime(history['Date'])
+    return history
+
+# Finds the first row of the stock data a refresh needs: HISTORY_DAYS trading days, the last 52 weeks (for the
+# year's range) and every day of the last period of each summary, which is written again.  There is at most one
+# row a day, so counting back one row per day always reaches the first of those days.
+def find_first_row(saved_workbook, data_rows, last_date):
+    first_date = last_date - datetime.timedelta(weeks=52)
+    for period_name in SUMMARY_SHEETS:
+        name = f'{period_name} Summary'
+        last_period = saved_workbook.rows(name, saved_workbook.last_row(name))[0]
+        first_date = min(first_date, pd.Timestamp(last_period[SUMMARY_COLUMNS.index('Start')]))
+    return max(2, data_rows + 2 - max(HISTORY_DAYS, (last_date - first_date).days + 1))
+
+# Reads a chart table of the dashboard (the dates followed by numbers)
+def read_chart_table(saved_workbook, name):
+    table = read_table(saved_workbook, name)
+    table['Date'] = pd.to_datetime(table['Date'])
+    return table.astype({column: 'float64' for column in table.columns[1:]})
+
+# Gets the prices after the last day in the dashboard, in the same columns as the stock data sheet
+def fetch_new_prices(provider, ticker_symbol, last_date, header, use_cache=True):
+    start_date = last_date + datetime.timedelta(days=1)
+    end_date = get_date_range()[1]
+    if start_date.date() > end_date.date():
+        return None
+
+    prices = provider.get_prices(ticker_symbol, start_date, end_date, use_cache)
+    prices = prices.rename_axis(None, axis=1).reset_index().reindex(columns=header)
+    return prices[prices['Date'] > last_date].reset_index(drop=True)
+
+# Gets the newest statements, or None if they could not be downloaded
+def fetch_new_statements(provider, ticker_symbol, use_cache=True):
+    statements = {}
+    try:
+        for function in ('INCOME_STATEMENT', 'BALANCE_SHEET'):
+            statements[function] = provider.get_statement(function, ticker_symbol, use_cache)
+        return [parse_reports(statements[function][reports]) for name, function, reports in STATEMENT_SHEETS]
+    except:
+        return None
+
+# Writes the new parts of the dashboard (in memory).  Returns the parts and the path of each sheet's part.
+def write_new_parts(ticker_symbol, all_dataframes, model, kept_rows=None):
+    buffer = io.BytesIO()
+    add_pivot_tables(ticker_symbol, all_dataframes, buffer, model, kept_rows=kept_rows)
+    parts = read_parts(buffer)
+    return (parts, sheet_paths(parts))
+
+# Brings an existing dashboard up to date.  Only the new trading days are added to the stock data, and only the
+# summary periods that include them are written again; the rows before them are copied from the saved dashboard.
+# The dashboard itself, its chart tables and the statements are written from the updated prices and statements.
+# Returns True if the dashboard was changed.
+def refresh_dashboard(excel_path, use_cache=True, provider=None):
+    if provider is None:
+        provider = make_provider(API_KEY)
+
+    saved_workbook = SavedWorkbook(excel_path)
+    ticker_symbol = saved_workbook.rows('Dashboard', 1, 1)[0][1].split(' ')[0]
+
+    # Get the trading days after the last one in the stock data
+    data_rows = saved_workbook.last_row('Stock Data') - 1
+    header = saved_workbook.rows('Stock Data', 1, 1)[0]
+    last_date = pd.Timestamp(saved_workbook.rows('Stock Data', data_rows + 1)[0][0])
+    try:
+        new_prices = fetch_new_prices(provider, ticker_symbol, last_date, header, use_cache)
+    except:
+        new_prices = None
+    if new_prices is None or new_prices.shape[0] == 0:
+        print(f"'{ticker_symbol}' is already up to date.")
+        return False
+
+    # Dashboards of one year or less show a window of the most recent days; keep showing it as days are added
+    is_window = saved_workbook.last_row('Closing Table') - 1 <= RECENT_DAYS
+    first_date = pd.Timestamp(saved_workbook.rows('Stock Data', 2, 2)[0][0])
+    years = (new_prices['Date'].iloc[-1] - first_date).days / 365.25
+    chart_years = OHLC_PERIODS[0][0] if is_window else years
+
+    # The highest close and maximum drawdown of the whole history are continued from the running state the
+    # dashboard keeps, so only the last days are read.  Long histories extend their chart tables as well, unless
+    # their bars have become longer (e.g. weekly to monthly).  Dashboards without the running state (made by an
+    # older version) are read completely.
+    running_state = None
+    if RUNNING_STATE_SHEET in saved_workbook.paths:
+        running_state = read_running_state(read_table(saved_workbook, RUNNING_STATE_SHEET))
+    if running_state is not None and running_state['Date'] != last_date:
+        running_state = None
+    saved_charts = None
+    if running_state is not None and not is_window:
+        if ohlc_period(years) == ohlc_period((last_date - first_date).days / 365.25):
+            saved_charts = (read_chart_table(saved_workbook, 'Closing Table'),
+                            read_chart_table(saved_workbook, 'Open-High-Low-Close Table'))
+        else:
+            running_state = None
+    if running_state is not None:
+        history = read_history(saved_workbook, new_prices, find_first_row(saved_workbook, data_rows, last_date))
+    else:
+        history = read_history(saved_workbook, new_prices)
+
+    # The newest statements, or the ones already in the dashboard if they cannot be downloaded
+    statements = fetch_new_statements(provider, ticker_symbol, use_cache)
+    if statements is None:
+        print(f"Could not retrieve the statements of '{ticker_symbol}'.  Keeping the ones already in the dashboard.")
+        statements = [read_statement(saved_workbook, name) for name, function, reports in STATEMENT_SHEETS]
+
+    model = build_model(ticker_symbol, [history] + list(statements), chart_years, running_state, saved_charts)
+
+    # Only the last period of each summary can hold the old last day, so it and the periods after it are written
+    # again and every period before it is kept
+    all_summaries = model['Summaries']
+    model['Summaries'] = {}
+    kept_rows = {'Stock Data': data_rows}
+    for period_name in SUMMARY_SHEETS:
+        summary = all_summaries[period_name]
+        model['Summaries'][period_name] = summary[summary['End'] >= last_date].reset_index(drop=True)
+        kept_rows[f'{period_name} Summary'] = saved_workbook.last_row(f'{period_name} Summary') - 2
+    parts, paths = write_new_parts(ticker_symbol, [new_prices] + list(statements), model, kept_rows)
+
+    if cell_styles(parts) == cell_styles(saved_workbook.parts):
+        for name, rows in kept_rows.items():
+            parts[paths[name]] = splice_rows(saved_workbook.sheet(name), parts[paths[name]], rows)
+    else:
+        # The dashboard was saved with other styles (e.g. by an older version or by excel), so its rows cannot be
+        # copied; read and write every row again
+        if running_state is not None:
+            history = read_history(saved_workbook, new_prices)
+            model = build_model(ticker_symbol, [history] + list(statements), chart_years)
+        else:
+            model['Summaries'] = all_summaries
+        parts, paths = write_new_parts(ticker_symbol, [history] + list(statements), model)
+
+    write_parts(excel_path, parts)
+    print(f"Added {new_prices.shape[0]} trading day(s) to '{ticker_symbol}' ({excel_path}).")
+    return True
+
+# Reads the command line arguments and refreshes every dashboard given
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Add the latest trading days to existing stock dashboards.')
+    parser.add_argument('paths', nargs='+', help='dashboards to bring up to date')
+    parser.add_argument('--no-cache', action='store_true', help='download all data again instead of using the cache')
+    parser.add_argument('--store', help='read the prices from this local store instead of downloading them')
+    args = parser.parse_args(argv)
+    provider = make_provider(API_KEY, args.store)
+
+    failed = 0
+    for path in args.paths:
+        try:
+            refresh_dashboard(path, not args.no_cache, provider)
+        except Exception as e:
+            print(f"Could not refresh '{path}' ({e!r})")
+            failed += 1
+
+    # Non-zero exit code if any dashboard could not be refreshed
+    return 0 if failed == 0 else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,237 @@
+# A module for screening every ticker symbol with cached statements at once: the latest quick, current and
+# debt-to-equity ratios and the latest yearly growth of each company, ranked and filtered in one table.
+# Run with "python -m StockDashboardApplication.program_code.screener --where "Current Ratio>1.5" -o screen.csv"
+
+import argparse # Used for reading the command line arguments
+import json # Used for reading the cached statements
+import os # Used for finding the cached statements
+import re # Used for reading the filters
+import sys # Used for the exit code
+from concurrent.futures import ProcessPoolExecutor # Used for reading thousands of statements at the same time
+
+import numpy as np # Used for pairing each report with the one before it
+import pandas as pd # Used for building the panel of every company
+
+from StockDashboardApplication.program_code.data_cache import CACHE_DIR
+from StockDashboardApplication.program_code.providers import STATEMENTS
+from StockDashboardApplication.program_code.batch import read_tickers
+from StockDashboardApplication.program_code.statements import parse_reports
+from StockDashboardApplication.program_code.latest_statistics import FinancialHealth, Growth
+from StockDashboardApplication.program_code.profiling import profiled
+
+# Statement values the screen needs; every other value is left out while the statements are read
+BALANCE_SHEET_FIELDS = ('fiscalDateEnding', 'totalCurrentAssets', 'inventory', 'totalCurrentLiabilities',
+                        'totalLiabilities', 'totalShareholderEquity')
+INCOME_STATEMENT_FIELDS = ('fiscalDateEnding', 'totalRevenue', 'operatingIncome', 'netIncome')
+
+# Columns of the screen that can be ranked and filtered
+METRIC_COLUMNS = ('Quick Ratio', 'Current Ratio', 'Debt-to-Equity', 'Revenue Growth', 'Operating Income Growth',
+                  'Net Income Growth')
+
+# Column the screen is ranked by, unless another is chosen
+DEFAULT_SORT = 'Revenue Growth'
+
+# Ticker symbols read by each worker process at a time
+READ_CHUNK = 64
+
+# Filters look like "Current Ratio>1.5" or "Debt-to-Equity <= 2"
+FILTER_PATTERN = re.compile(r'^\s*(.+?)\s*(>=|<=|>|<)\s*(-?[0-9.]+)\s*$')
+
+# Gets every ticker symbol with both statements cached in any of the folders (e.g. the cache and a local store)
+def find_tickers(statement_dirs):
+    tickers = set()
+    for statement_dir in statement_dirs:
+        if not os.path.isdir(statement_dir):
+            continue
+        for name in os.listdir(statement_dir):
+            if all(os.path.exists(os.path.join(statement_dir, name, f'{function}.json')) for function in STATEMENTS):
+                tickers.add(name.upper())
+    return sorted(tickers)
+
+# Reads a cached statement from the first folder that has it, or None if none do
+def read_cached_statement(statement_dirs, function, ticker_symbol):
+    for statement_dir in statement_dirs:
+        path = os.path.join(statement_dir, ticker_symbol.upper(), f'{function}.json')
+        if os.path.exists(path):
+            with open(path) as f:
+                return json.load(f)
+    return None
+
+# Keeps only the given values of a report
+def select_fields(report, fields):
+    return {field: report.get(field) for field in fields}
+
+# Reads the reports a ticker symbol's screen needs: its latest quarterly balance sheet and its latest two yearly
+# income statements (the older one is None if there is only one).  Returns None if a statement is missing.
+def read_latest_reports(statement_dirs, ticker_symbol):
+    try:
+        balance_sheet = read_cached_statement(statement_dirs, STATEMENTS[1], ticker_symbol)
+        income_statement = read_cached_statement(statement_dirs, STATEMENTS[0], ticker_symbol)
+        balance_sheet_reports = balance_sheet['quarterlyReports']
+        income_statement_reports = income_statement['annualReports']
+    except:
+        return None
+    if len(balance_sheet_reports) == 0 or len(income_statement_reports) == 0:
+        return None
+
+    latest_income_statements = [select_fields(report, INCOME_STATEMENT_FIELDS)
+                                for report in income_statement_reports[:2]]
+    if len(latest_income_statements) == 1:
+        latest_income_statements.append(None)
+    return (select_fields(balance_sheet_reports[0], BALANCE_SHEET_FIELDS), latest_income_statements)
+
+# Reads the reports of every ticker symbol in a worker process
+def read_chunk(statement_dirs, tickers):
+    return [read_latest_reports(statement_dirs, ticker_symbol) for ticker_symbol in tickers]
+
+# Reads the latest reports of every ticker symbol into two panels: one balance sheet row per company, and two
+# income statement rows per company (the latest year, then the year before it).
+# Returns the ticker symbols in the panels, the two panels and the ticker symbols without cached statements.
+@profiled('load_panel')
+def load_panel(statement_dirs, tickers, workers=None):
+    chunks = [tickers[i:i + READ_CHUNK] for i in range(0, len(tickers), READ_CHUNK)]
+    if len(chunks) <= 1:
+        results = [read_chunk(statement_dirs, chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(read_chunk, [statement_dirs] * len(chunks), chunks))
+
+    found = []
+    missing = []
+    balance_sheets = []
+    income_statements = []
+    for ticker_symbol, reports in zip(tickers, [reports for result in results for reports in result]):
+        if reports is None:
+            missing.append(ticker_symbol)
+            continue
+        found.append(ticker_symbol)
+        balance_sheets.append(reports[0])
+        income_statements.extend(report or select_fields({}, INCOME_STATEMENT_FIELDS) for report in reports[1])
+
+    # The text of every report is converted to numbers a whole column at a time
+    balance_sheet_panel = parse_reports(balance_sheets).reindex(columns=list(BALANCE_SHEET_FIELDS))
+    income_statement_panel = parse_reports(income_statements).reindex(columns=list(INCOME_STATEMENT_FIELDS))
+    return (found, balance_sheet_panel, income_statement_panel, missing)
+
+# Calculates the ratios and growth of every company in the panels at once, with the same calculations as the
+# dashboard.  Each company's two income statement rows are next to each other, so the growth of the first row is
+# calculated against the second, and only the first rows are kept.
+@profiled('screen')
+def screen(tickers, balance_sheet_panel, income_statement_panel):
+    ratios = FinancialHealth(balance_sheet_panel, None).ratios
+    growth = Growth(income_statement_panel).growth.iloc[np.arange(0, len(tickers) * 2, 2)]
+
+    table = pd.DataFrame({
+        'Ticker': tickers,
+        'Balance Sheet Date': balance_sheet_panel['fiscalDateEnding'].to_numpy(),
+        'Quick Ratio': ratios['Quick Ratio'].to_numpy(),
+        'Current Ratio': ratios['Current Ratio'].to_numpy(),
+        'Debt-to-Equity': ratios['Debt-to-Equity'].to_numpy(),
+        'Income Statement Date': income_statement_panel['fiscalDateEnding'].to_numpy()[::2],
+        'Revenue Growth': growth['Revenue Growth'].to_numpy(),
+        'Operating Income Growth': growth['Operating Income Growth'].to_numpy(),
+        'Net Income Growth': growth['Net Income Growth'].to_numpy()
+    })
+    table[list(METRIC_COLUMNS)] = table[list(METRIC_COLUMNS)].round(2)
+    return table
+
+# Finds the screen's column with the given name, ignoring case
+def find_column(name):
+    for column in METRIC_COLUMNS:
+        if column.lower() == name.strip().lower():
+            return column
+    raise ValueError(f"'{name}' is not a column of the screen (use one of: {', '.join(METRIC_COLUMNS)})")
+
+# Reads a filter such as "Current Ratio>1.5".  Returns the column, the comparison and the value.
+def parse_filter(text):
+    match = FILTER_PATTERN.match(text)
+    if match is None:
+        raise ValueError(f"'{text}' is not a filter (e.g. \"Current Ratio>1.5\")")
+    try:
+        value = float(match.group(3))
+    except ValueError:
+        raise ValueError(f"'{match.group(3)}' is not a number")
+    return (find_column(match.group(1)), match.group(2), value)
+
+# Keeps the companies that pass every filter (a company that could not be calculated never passes)
+def apply_filters(table, filters):
+    keep = np.ones(table.shape[0], dtype=bool)
+    for column, comparison, value in filters:
+        values = table[column].to_numpy(dtype=np.float64)
+        with np.errstate(invalid='ignore'):
+            if comparison == '>':
+                keep &= values > value
+            elif comparison == '>=':
+                keep &= values >= value
+            elif comparison == '<':
+                keep &= values < value
+            else:
+                keep &= values <= value
+    return table[keep].reset_index(drop=True)
+
+# Sorts the companies by a column (companies that could not be calculated go last) and numbers them
+def rank(table, sort_by=DEFAULT_SORT, ascending=False):
+    ranked = table.sort_values(sort_by, ascending=ascending, na_position='last', kind='stable').reset_index(drop=True)
+    ranked.insert(0, 'Rank', np.arange(1, ranked.shape[0] + 1))
+    return ranked
+
+# Saves the screen as a CSV file, or as an excel sheet with filter buttons if the path ends with .xlsx.
+# Returns the path it was saved to.
+def write_screen(table, output):
+    if not output.lower().endswith('.xlsx'):
+        table.to_csv(output, index=False, date_format='%Y-%m-%d')
+        return output
+
+    # openpyxl is only needed for the excel sheet
+    import openpyxl
+    from StockDashboardApplication.program_code.dashboard import make_pivot_table, save_workbook
+
+    wb = openpyxl.Workbook(write_only=True)
+    make_pivot_table(wb, table, 'Screen', [str(di) for di in table.columns.tolist()])
+    return save_workbook(wb, (output, os.path.basename(output)))
+
+# Screens the ticker symbols (or every ticker symbol with cached statements) and saves the ranked table.
+# Returns the path it was saved to, the number of companies kept and the ticker symbols without statements.
+def build_screen(tickers, output, filters=(), sort_by=DEFAULT_SORT, ascending=False, store_dir=None, workers=None):
+    statement_dirs = [CACHE_DIR] if store_dir is None else [store_dir, CACHE_DIR]
+    if len(tickers) == 0:
+        tickers = find_tickers(statement_dirs)
+
+    found, balance_sheet_panel, income_statement_panel, missing = load_panel(statement_dirs, tickers, workers)
+    table = rank(apply_filters(screen(found, balance_sheet_panel, income_statement_panel), filters), sort_by,
+                 ascending)
+    return (write_screen(table, output), table.shape[0], missing)
+
+# Reads the command line arguments and saves the screen
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Screen the cached statements of many companies at once.')
+    parser.add_argument('tickers', nargs='*', help='ticker symbols to screen (every cached one if none are given)')
+    parser.add_argument('-f', '--file', help='file with one ticker symbol per line')
+    parser.add_argument('-o', '--output', default='Stock_Screen.csv', help='path the screen is saved to (.csv or .xlsx)')
+    parser.add_argument('--where', action='append', default=[],
+                        help='only keep companies passing this filter, e.g. "Debt-to-Equity<1" (can be repeated)')
+    parser.add_argument('--sort', default=DEFAULT_SORT, help='column the companies are ranked by')
+    parser.add_argument('--ascending', action='store_true', help='rank the smallest values first')
+    parser.add_argument('--store', help='also read the statements from this local store')
+    parser.add_argument('--workers', type=int, default=None, help='number of processes reading the statements')
+    args = parser.parse_args(argv)
+
+    try:
+        filters = [parse_filter(text) for text in args.where]
+        sort_by = find_column(args.sort)
+    except ValueError as e:
+        parser.error(str(e))
+
+    tickers = read_tickers(args.tickers, args.file)
+    path, kept, missing = build_screen(tickers, args.output, filters, sort_by, args.ascending, args.store,
+                                       args.workers)
+
+    for ticker_symbol in missing:
+        print(f"Left out '{ticker_symbol}': its statements are not cached")
+    print(f'Saved {kept} companies to {path}.')
+    return 0
+
+if __name__ == '__main__':
+    # Run through the imported module so the worker processes can find read_chunk
+    from StockDashboardApplication.program_code import screener
+    sys.exit(screener.main())
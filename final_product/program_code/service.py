@@ -0,0 +1,291 @@
+# A module for serving dashboards over HTTP from one long-running process, so each dashboard does not have to
+# start Python, import pandas and openpyxl and open new connections first.
+# Run with "python -m StockDashboardApplication.program_code.service --port 8000", then download
+# http://127.0.0.1:8000/dashboard/AAPL?years=5 (add &format=json or &format=html to see it without the excel file)
+
+import argparse # Used for reading the command line arguments
+import json # Used for the status and error responses
+import os # Used for finding the number of processors
+import sys # Used for the exit code
+import threading # Used for limiting the number of requests
+from concurrent.futures import ProcessPoolExecutor, wait # Used for the warm worker processes
+from concurrent.futures.process import BrokenProcessPool # Used for noticing a worker process that was killed
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler # Used for answering the requests
+from urllib.parse import urlsplit, parse_qs # Used for reading the ticker symbol and years from the URL
+
+import requests # Used for recognizing download errors
+
+from StockDashboardApplication.program_code.main import API_KEY, get_date_range, fetch_stock_data
+from StockDashboardApplication.program_code.providers import make_provider
+from StockDashboardApplication.program_code.rate_limiter import RateLimitError
+from StockDashboardApplication.program_code.jobs import JobCoalescer, build_key
+from StockDashboardApplication.program_code.dashboard_cache import DashboardCache, dashboard_key
+from StockDashboardApplication.program_code.web_dashboard import CONTENT_TYPES, web_dashboard_bytes
+
+# Address the service listens on; only this computer can reach it unless another host is given
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8000
+
+# Requests that can wait for a worker, besides the ones being created; any more are turned away
+MAX_QUEUE = 16
+
+# Most years of history a request can ask for
+MAX_YEARS = 30
+
+# Content type of an excel file
+XLSX_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Formats a dashboard can be sent as
+FORMATS = ('xlsx',) + tuple(CONTENT_TYPES)
+
+# Imports everything needed to create a dashboard, so a worker process is ready before its first request
+def warm_up():
+    from StockDashboardApplication.program_code import dashboard
+    return os.getpid()
+
+# Creates a dashboard in a worker process, returning the bytes of the excel file (nothing is written to disk)
+def render_dashboard(ticker_symbol, all_dataframes):
+    from StockDashboardApplication.program_code.dashboard import dashboard_bytes
+    return dashboard_bytes(ticker_symbol, all_dataframes)
+
+# Chooses the HTTP status and a short message for a download that failed.  Only an unknown ticker symbol (one
+# the local store or alpha vantage does not have) is 404; a data source that is slow or failing is 504 or 502.
+# The full error (which may hold file paths) is only printed to the service's log.
+def fetch_error(ticker_symbol, error):
+    if isinstance(error, RateLimitError):
+        return (429, f'Could not retrieve data.  {error}')
+    print(f"Could not retrieve data for '{ticker_symbol}' ({error!r})", file=sys.stderr)
+    if isinstance(error, KeyError):
+        return (404, f"No data was found for '{ticker_symbol}'.")
+    if isinstance(error, requests.Timeout):
+        return (504, 'The data source took too long to respond.  Please try again shortly.')
+    return (502, 'Could not retrieve data from the data source.  Please try again shortly.')
+
+# Creates dashboards for the requests.  The data is downloaded on the request's thread in this process (so the
+# cache, the alpha vantage call limits and the open connections are shared); the excel files are created by a
+# fixed number of worker processes that stay running between requests.  Identical requests made at the same
+# time share one build, and dashboards whose data has not changed are sent from the dashboard cache.
+# JSon and web page dashboards only need the dashboard model, so they are created on the request's thread.
+class DashboardService:
+    # Constructor
+    def __init__(self, workers=None, max_queue=MAX_QUEUE, use_cache=True, provider=None, dashboard_cache=None):
+        self.workers = workers or os.cpu_count()
+        self.use_cache = use_cache
+        self.provider = make_provider(API_KEY) if provider is None else provider
+        self.render_pool = ProcessPoolExecutor(max_workers=self.workers, initializer=warm_up)
+
+        # Every request being downloaded, created or waiting holds a slot until its dashboard is ready
+        self.capacity = self.workers + max_queue
+        self.slots = threading.BoundedSemaphore(self.capacity)
+        self.lock = threading.Lock()
+        self.in_progress = 0
+        self.served = 0
+
+        self.jobs = JobCoalescer()
+        self.dashboard_cache = dashboard_cache
+        self.cache_hits = 0
+        self.pool_restarts = 0
+
+    # Starts every worker process and imports the download libraries, so the first request is as fast as the rest
+    def start(self):
+        from StockDashboardApplication.program_code import data_sources
+        wait([self.render_pool.submit(warm_up) for i in range(self.workers)])
+
+    # Stops the worker processes
+    def close(self):
+        self.render_pool.shutdown()
+
+    # Takes a slot for a request, or returns False if too many requests are already waiting
+    def try_acquire(self):
+        if not self.slots.acquire(blocking=False):
+            return False
+        with self.lock:
+            self.in_progress += 1
+        return True
+
+    # Gives back a request's slot
+    def release(self):
+        with self.lock:
+            self.in_progress -= 1
+            self.served += 1
+        self.slots.release()
+
+    # Number of workers, requests and builds, for the /health page
+    def status(self):
+        with self.lock:
+            status = {'workers': self.workers, 'capacity': self.capacity, 'in_progress': self.in_progress,
+                      'served': self.served, 'cache_hits': self.cache_hits, 'pool_restarts': self.pool_restarts}
+        status['builds'] = self.jobs.status()
+        return status
+
+    # Gets the dashboard of a ticker symbol covering the given number of years in one of the FORMATS, joining the
+    # build of an identical request if one is already running.  Returns the HTTP status and the bytes of the
+    # dashboard (or the error).
+    def request(self, ticker_symbol, years, output_format='xlsx'):
+        start_date, end_date = get_date_range(365 * years)
+        key = build_key(ticker_symbol, start_date, end_date, use_cache=self.use_cache, output_format=output_format)
+        return self.jobs.run(key, self.create_dashboard, ticker_symbol, start_date, end_date, output_format)[0]
+
+    # Creates a dashboard, holding a slot until it is ready (or turning the request away if there are none left).
+    # Returns the HTTP status and the bytes of the dashboard (or the error).
+    def create_dashboard(self, ticker_symbol, start_date, end_date, output_format='xlsx'):
+        if not self.try_acquire():
+            return (503, 'Too many dashboards are being created.  Please try again shortly.')
+        try:
+            try:
+                all_dataframes = self.fetch(ticker_symbol, start_date, end_date)
+            except Exception as e:
+                return fetch_error(ticker_symbol, e)
+            if all_dataframes[0].shape[0] == 0:
+                return (404, f"No prices were found for '{ticker_symbol}'.")
+
+            try:
+                if output_format != 'xlsx':
+                    return (200, web_dashboard_bytes(ticker_symbol, all_dataframes, output_format))
+                return (200, self.get_dashboard(ticker_symbol, all_dataframes))
+            except Exception as e:
+                print(f"Could not create the dashboard of '{ticker_symbol}' ({e!r})", file=sys.stderr)
+                return (500, f"Could not create the dashboard of '{ticker_symbol}'.")
+        finally:
+            self.release()
+
+    # Downloads the data of a ticker symbol between the start and end dates
+    def fetch(self, ticker_symbol, start_date, end_date):
+        return fetch_stock_data(ticker_symbol, start_date, end_date, self.use_cache, self.provider)
+
+    # Creates the dashboard in a worker process.  Returns the bytes of the excel file.
+    # If a worker process died (e.g. killed for running out of memory), the pool can no longer be used, so new
+    # worker processes are started and the dashboard is tried once more.
+    def render(self, ticker_symbol, all_dataframes):
+        render_pool = self.render_pool
+        try:
+            return render_pool.submit(render_dashboard, ticker_symbol, all_dataframes).result()
+        except BrokenProcessPool:
+            self.restart_pool(render_pool)
+            return self.render_pool.submit(render_dashboard, ticker_symbol, all_dataframes).result()
+
+    # Replaces a broken pool of worker processes with a new one (only once, if many requests find it broken)
+    def restart_pool(self, broken_pool):
+        with self.lock:
+            if self.render_pool is not broken_pool:
+                return
+            self.render_pool = ProcessPoolExecutor(max_workers=self.workers, initializer=warm_up)
+            self.pool_restarts += 1
+        broken_pool.shutdown(wait=False)
+
+    # Gets the dashboard from the dashboard cache if its data has not changed, otherwise creates (and caches) it.
+    # Returns the bytes of the excel file.
+    def get_dashboard(self, ticker_symbol, all_dataframes):
+        if self.dashboard_cache is None:
+            return self.render(ticker_symbol, all_dataframes)
+
+        key = dashboard_key(ticker_symbol, all_dataframes)
+        content = self.dashboard_cache.get(key)
+        if content is not None:
+            with self.lock:
+                self.cache_hits += 1
+            return content
+
+        content = self.render(ticker_symbol, all_dataframes)
+        self.dashboard_cache.put(key, content)
+        return content
+
+# Answers GET /dashboard/TICKER?years=N&format=xlsx with the dashboard (the excel file, JSon or a web page), and
+# GET /health with the service's status
+class DashboardHandler(BaseHTTPRequestHandler):
+    # Reads the request and sends back the dashboard (or an error)
+    def do_GET(self):
+        service = self.server.service
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split('/') if part != '']
+
+        if parts == ['health']:
+            return self.send_json(200, service.status())
+        if len(parts) != 2 or parts[0] != 'dashboard':
+            return self.send_json(404, {'error': 'Use /dashboard/TICKER?years=N'})
+
+        # Ticker symbols only have letters, numbers, dots and dashes (e.g. BRK-B), so they are safe in a file name
+        ticker_symbol = parts[1].upper()
+        if not ticker_symbol.replace('.', '').replace('-', '').isalnum():
+            return self.send_json(400, {'error': f"'{parts[1]}' is not a ticker symbol"})
+        query = parse_qs(url.query)
+        try:
+            years = int(query.get('years', ['1'])[0])
+        except ValueError:
+            return self.send_json(400, {'error': 'years must be a whole number'})
+        if years < 1 or years > MAX_YEARS:
+            return self.send_json(400, {'error': f'years must be between 1 and {MAX_YEARS}'})
+        output_format = query.get('format', ['xlsx'])[0].lower()
+        if output_format not in FORMATS:
+            return self.send_json(400, {'error': f"format must be one of {', '.join(FORMATS)}"})
+
+        status, result = service.request(ticker_symbol, years, output_format)
+        if status == 503:
+            return self.send_json(status, {'error': result}, {'Retry-After': '5'})
+        if status != 200:
+            return self.send_json(status, {'error': result})
+        if output_format != 'xlsx':
+            return self.send_content(result, CONTENT_TYPES[output_format])
+        self.send_content(result, XLSX_TYPE, f'{ticker_symbol}_Stock_Dashboard.xlsx')
+
+    # Sends a JSon response
+    def send_json(self, status, body, headers=None):
+        content = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    # Sends back the bytes of a dashboard, as a download if it has a file name
+    def send_content(self, content, content_type, file_name=None):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        if file_name is not None:
+            self.send_header('Content-Disposition', f'attachment; filename="{file_name}"')
+        self.end_headers()
+        self.wfile.write(content)
+
+# Starts the service and answers requests until it is stopped (Ctrl+C)
+def run_service(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None, max_queue=MAX_QUEUE, use_cache=True,
+                provider=None, dashboard_cache=None):
+    service = DashboardService(workers, max_queue, use_cache, provider, dashboard_cache)
+    service.start()
+
+    server = ThreadingHTTPServer((host, port), DashboardHandler)
+    server.service = service
+    print(f'Serving dashboards at http://{host}:{server.server_address[1]}/dashboard/TICKER?years=N '
+          f'with {service.workers} workers (Ctrl+C to stop).')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+# Reads the command line arguments and runs the service
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve stock dashboards over HTTP.')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='address to listen on')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='port to listen on')
+    parser.add_argument('--workers', type=int, default=None, help='number of processes creating excel files')
+    parser.add_argument('--max-queue', type=int, default=MAX_QUEUE,
+                        help='requests that can wait for a worker before new ones are turned away')
+    parser.add_argument('--no-cache', action='store_true', help='download all data again instead of using the cache')
+    parser.add_argument('--store', help='read the prices from this local store instead of downloading them')
+    parser.add_argument('--no-dashboard-cache', action='store_true',
+                        help='create every dashboard again, even if its data has not changed')
+    args = parser.parse_args(argv)
+
+    run_service(args.host, args.port, args.workers, args.max_queue, not args.no_cache,
+                make_provider(API_KEY, args.store), None if args.no_dashboard_cache else DashboardCache())
+    return 0
+
+if __name__ == '__main__':
+    # Run through the imported module so the worker processes can find warm_up
+    from StockDashboardApplication.program_code import service
+    sys.exit(service.main())
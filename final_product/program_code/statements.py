@@ -0,0 +1,54 @@
+# A module for converting the income statements and balance sheets from alpha vantage into typed dataframes
+
+import numpy as np # Used for building the number columns
+import pandas as pd # Used for building the dataframes
+
+# Alpha vantage sends every value as text; these are the columns that are not numbers.
+# Every other column is a number (int64, or float64 when a value is missing).
+STATEMENT_SCHEMA = {
+    'fiscalDateEnding': 'date',
+    'reportedCurrency': 'text'
+}
+
+# Values alpha vantage uses when a number is missing
+MISSING_VALUES = ('None', '', '-')
+
+# Converts one column of text values into numbers
+def parse_number_column(values):
+    missing = [value is None or value in MISSING_VALUES for value in values]
+
+    # Whole numbers without any missing values stay as integers
+    if not any(missing):
+        try:
+            return np.array(values, dtype=np.int64)
+        except (ValueError, OverflowError):
+            pass
+
+    numbers = np.empty(len(values), dtype=np.float64)
+    for i, value in enumerate(values):
+        if missing[i]:
+            numbers[i] = np.nan
+        else:
+            try:
+                numbers[i] = float(value)
+            except ValueError:
+                numbers[i] = np.nan
+    return numbers
+
+# Converts a list of reports (e.g. is_data['quarterlyReports']) into a dataframe with typed columns
+def parse_reports(reports, schema=STATEMENT_SCHEMA):
+    # Every column, in the order alpha vantage sends them
+    columns = list(dict.fromkeys(key for report in reports for key in report))
+
+    data = {}
+    for column in columns:
+        values = [report.get(column) for report in reports]
+        kind = schema.get(column, 'number')
+        if kind == 'date':
+            data[column] = pd.to_datetime(pd.Series(values, dtype=object), format='%Y-%m-%d', errors='coerce')
+        elif kind == 'text':
+            data[column] = pd.Series(values, dtype=object)
+        else:
+            data[column] = parse_number_column(values)
+
+    return pd.DataFrame(data, columns=columns)
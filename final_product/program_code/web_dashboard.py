@@ -0,0 +1,212 @@
+# A module for showing a dashboard model as JSon or as a web page, without creating the excel file.
+# Only the model is calculated (openpyxl is never imported), so a dashboard can be shown in a browser in a few
+# milliseconds and the excel file only created when someone downloads it.
+
+import datetime # Used for writing the dates
+import html # Used for escaping the text of the web page
+import json # Used for the JSon dashboard
+
+import numpy as np # Used for converting NumPy values
+import pandas as pd # Used for converting the tables
+
+from StockDashboardApplication.program_code.dashboard_model import build_model, format_amount, format_date, \
+    format_price, format_percent
+from StockDashboardApplication.program_code.indicators import SMA_WINDOWS, ATR_WINDOW, VOLATILITY_WINDOW
+from StockDashboardApplication.program_code.profiling import profiled
+
+# Size of each chart on the web page, in pixels
+CHART_WIDTH = 720
+CHART_HEIGHT = 280
+CHART_MARGIN = 40
+
+# Colors of the lines in each chart, in the order of the table's columns
+LINE_COLORS = ('#1f4e79', '#ed7d31', '#70ad47', '#a5a5a5', '#a5a5a5', '#ffc000')
+
+# Content type of each format
+CONTENT_TYPES = {'json': 'application/json', 'html': 'text/html; charset=utf-8'}
+
+# Converts one value of the model to a value JSon can hold (dates become text, NaN becomes None)
+def plain_value(value):
+    if isinstance(value, pd.DataFrame):
+        return plain_table(value)
+    if isinstance(value, dict):
+        return {str(key): plain_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [plain_value(item) for item in value]
+    if isinstance(value, np.datetime64):
+        value = pd.Timestamp(value)
+    if isinstance(value, datetime.date):
+        return None if pd.isna(value) else value.strftime('%Y-%m-%d')
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+# Converts a table to its column names and rows, converting a whole column at a time
+def plain_table(table):
+    columns = []
+    for name in table.columns:
+        column = table[name]
+        if pd.api.types.is_datetime64_any_dtype(column):
+            values = column.dt.strftime('%Y-%m-%d').tolist()
+        else:
+            values = column.tolist()
+        columns.append([None if pd.isna(value) else value for value in values])
+    return {'columns': [str(name) for name in table.columns], 'rows': [list(row) for row in zip(*columns)]}
+
+# Converts the whole model to values JSon can hold
+@profiled('model_to_dict')
+def model_to_dict(model):
+    return plain_value(model)
+
+# The model as JSon bytes
+def render_json(model):
+    return json.dumps(model_to_dict(model), allow_nan=False).encode('utf-8')
+
+# Draws a line for each of the columns of a table as an SVG chart (the first column is the x-axis)
+def line_chart(table, title, columns, percent=False):
+    width = CHART_WIDTH - 2 * CHART_MARGIN
+    height = CHART_HEIGHT - 2 * CHART_MARGIN
+    values = table[list(columns)].to_numpy(dtype=np.float64) if table.shape[0] > 0 else np.empty((0, len(columns)))
+
+    parts = [f'<svg width="{CHART_WIDTH}" height="{CHART_HEIGHT}" role="img">',
+             f'<text x="{CHART_MARGIN}" y="20" font-weight="bold">{html.escape(title)}</text>']
+    if values.shape[0] < 2 or np.isnan(values).all():
+        parts.append(f'<text x="{CHART_MARGIN}" y="{CHART_HEIGHT // 2}">Not enough data.</text></svg>')
+        return ''.join(parts)
+
+    low = float(np.nanmin(values))
+    high = float(np.nanmax(values))
+    if high == low:
+        high = low + 1
+    xs = CHART_MARGIN + np.arange(values.shape[0]) * width / (values.shape[0] - 1)
+    ys = CHART_MARGIN + (high - values) * height / (high - low)
+
+    # The range of the values and the first and last days
+    label = (lambda value: f'{value:.1f}%') if percent else (lambda value: f'{value:,.2f}')
+    first_day = plain_value(table.iat[0, 0])
+    last_day = plain_value(table.iat[table.shape[0] - 1, 0])
+    parts.append(f'<text x="{CHART_MARGIN + width}" y="{CHART_MARGIN}" text-anchor="end" font-size="11">'
+                 f'{label(high)}</text>')
+    parts.append(f'<text x="{CHART_MARGIN + width}" y="{CHART_MARGIN + height}" text-anchor="end" font-size="11">'
+                 f'{label(low)}</text>')
+    parts.append(f'<text x="{CHART_MARGIN}" y="{CHART_HEIGHT - 10}" font-size="11">{first_day}</text>')
+    parts.append(f'<text x="{CHART_MARGIN + width}" y="{CHART_HEIGHT - 10}" text-anchor="end" font-size="11">'
+                 f'{last_day}</text>')
+
+    # One line per column, broken where a value is missing
+    for i, name in enumerate(columns):
+        color = LINE_COLORS[i % len(LINE_COLORS)]
+        path = []
+        drawing = False
+        for x, y in zip(xs, ys[:, i]):
+            if np.isnan(y):
+                drawing = False
+                continue
+            path.append(f'{"L" if drawing else "M"}{x:.1f},{y:.1f}')
+            drawing = True
+        dash = '' if i == 0 else ' stroke-dasharray="4 3"'
+        parts.append(f'<path d="{" ".join(path)}" fill="none" stroke="{color}" stroke-width="1.5"{dash}/>')
+        parts.append(f'<text x="{CHART_MARGIN + 90 * i}" y="{CHART_HEIGHT - 24}" font-size="11" fill="{color}">'
+                     f'{html.escape(str(name))}</text>')
+    parts.append('</svg>')
+    return ''.join(parts)
+
+# A titled table of labels and values
+def stat_section(title, note, rows):
+    parts = [f'<section><h2>{html.escape(title)}</h2>']
+    if note:
+        parts.append(f'<p class="note">{html.escape(note)}</p>')
+    parts.append('<table>')
+    for label, value in rows:
+        parts.append(f'<tr><th>{html.escape(label)}</th><td>{html.escape(str(value))}</td></tr>')
+    parts.append('</table></section>')
+    return ''.join(parts)
+
+# Rounds a ratio or growth, as the excel dashboard does
+def format_ratio(value, suffix=''):
+    if value is None:
+        return 'Could not calculate.'
+    return f'{round(value, 2)}{suffix}'
+
+# The model as a web page: the statistics beside SVG charts of the prices, ratios and growth
+@profiled('render_html')
+def render_html(model):
+    ticker_symbol = html.escape(model['Ticker'])
+    prices = model['Prices']
+    volatility = model['Volatility']
+    financial_health = model['Financial Health']
+    growth = model['Growth']
+    charts = model['Charts']
+    report_date = format_date(prices['Report Date'])
+
+    overview = [
+        ('Previous Close', format_price(prices['Last Close'])),
+        ('Volume Traded', f"{prices['Volume']:,} shares"),
+        ("Day's Range", f"{format_price(prices['Day Range'][0])} - {format_price(prices['Day Range'][1])}"),
+        ('52-Week Range', f"{format_price(prices['Year Range'][0])} - {format_price(prices['Year Range'][1])}"),
+        (f'Revenue ({report_date})', f"${format_amount(prices['Revenue'])}"),
+        (f'Net Income ({report_date})', f"${format_amount(prices['Net Income'])}")
+    ]
+
+    bands = 'N/A'
+    if volatility['Lower Band'] is not None:
+        bands = f"{format_price(volatility['Lower Band'])} - {format_price(volatility['Upper Band'])}"
+    max_drawdown = volatility['Max Drawdown']
+    volatility_rows = [(f'{window}-Day SMA', format_price(volatility[f'SMA {window}'])) for window in SMA_WINDOWS]
+    volatility_rows += [
+        ('Bollinger Bands', bands),
+        (f'ATR ({ATR_WINDOW} days)', format_price(volatility['ATR'])),
+        (f'Volatility ({VOLATILITY_WINDOW} days)', format_percent(volatility['Volatility'])),
+        ('Volatility (1 year)', format_percent(volatility['Yearly Volatility'])),
+        ('Max Drawdown', format_percent(None if max_drawdown is None else max_drawdown[0]))
+    ]
+    if max_drawdown is not None:
+        volatility_rows.append(('', f'From {format_date(max_drawdown[1])} to {format_date(max_drawdown[2])}'))
+
+    closing_table = charts['Closing Table']
+    ratio_table = charts['Financial Health History']
+    growth_table = charts['Growth History']
+
+    page = [
+        '<!DOCTYPE html><html><head><meta charset="utf-8">',
+        f'<title>{ticker_symbol} Dashboard</title>',
+        '<style>body{font-family:Arial,sans-serif;background:#d3d3d3;color:#000;margin:24px}'
+        '.card{background:#fff;padding:12px;margin:0 12px 12px 0;display:inline-block;vertical-align:top}'
+        'h1{font-size:20px;margin:0}h2{font-size:16px;margin:0 0 4px}.price{font-size:24px;margin:4px 0 16px}'
+        '.note{font-size:11px;font-style:italic;margin:0 0 6px}th{text-align:left;font-weight:normal;'
+        'padding-right:16px}table{font-size:13px}</style></head><body>',
+        f'<h1>{ticker_symbol} Dashboard</h1>',
+        f'<p class="price">{format_price(prices["Last Close"])} <span class="note">* Price from last close.</span></p>',
+        '<div class="card">',
+        line_chart(closing_table, f'{model["Ticker"]} Closing Prices', closing_table.columns[1:]),
+        '</div><div class="card">',
+        stat_section('Financial Health', f"As of {format_date(financial_health['As Of'])}", [
+            ('Quick Ratio', format_ratio(financial_health['Quick Ratio'])),
+            ('Current Ratio', format_ratio(financial_health['Current Ratio'])),
+            ('Debt-to-Equity', format_ratio(financial_health['Debt-to-Equity']))
+        ]),
+        stat_section('Growth', f"As of {format_date(growth['As Of'])}", [
+            ('Revenue Growth', format_ratio(growth['Revenue Growth'], '%')),
+            ('Operating Income Growth', format_ratio(growth['Operating Income Growth'], '%')),
+            ('Net Income Growth', format_ratio(growth['Net Income Growth'], '%'))
+        ]),
+        '</div><br><div class="card">',
+        stat_section('Statistics Overview', "* NOTICE: Stats do not include today's values.", overview),
+        '</div><div class="card">',
+        stat_section('Volatility', f"As of {format_date(volatility['Date'])}", volatility_rows),
+        '</div><br><div class="card">',
+        line_chart(ratio_table, 'Financial Health History', ratio_table.columns[1:]),
+        '</div><div class="card">',
+        line_chart(growth_table, 'Growth History (%)', growth_table.columns[1:], percent=True),
+        '</div></body></html>'
+    ]
+    return ''.join(page).encode('utf-8')
+
+# Renderers of each format
+RENDERERS = {'json': render_json, 'html': render_html}
+
+# Calculates the dashboard of a ticker symbol and returns it as JSon or a web page (as bytes)
+def web_dashboard_bytes(ticker_symbol, all_dataframes, output_format):
+    return RENDERERS[output_format](build_model(ticker_symbol, all_dataframes))
@@ -0,0 +1,156 @@
+# A module for reading and rewriting the parts of a saved workbook (the XML files inside the excel file, which is
+# a zip file) without loading the whole workbook into openpyxl.  Only the rows that are needed are read, and rows
+# that do not change can be copied into a new workbook byte for byte.
+
+import re # Used for renumbering rows
+import zipfile # Used for reading and writing the parts of the excel file
+import xml.etree.ElementTree as ET # Used for reading the rows
+
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format # Used for finding the date cells
+from openpyxl.utils.cell import column_index_from_string # Used for placing each cell in its column
+from openpyxl.utils.datetime import from_excel # Used for reading the dates
+
+from StockDashboardApplication.program_code.data_cache import replace_file
+
+# Namespaces of the workbook's XML
+MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+RELATIONSHIP_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+PACKAGE_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+# Start of a row and of a cell in a sheet's XML, e.g. <row r="12"> and <c r="B12"
+ROW_PATTERN = re.compile(rb'<row r="(\d+)"')
+CELL_PATTERN = re.compile(rb'<c r="([A-Z]+)(\d+)"')
+
+# Column of a cell's reference, e.g. the B of B12
+COLUMN_PATTERN = re.compile(r'[A-Z]+')
+
+# Reads every part of an excel file.  Returns the bytes of each part, by its path in the zip file.
+def read_parts(source):
+    with zipfile.ZipFile(source) as zip_file:
+        return {info.filename: zip_file.read(info.filename) for info in zip_file.infolist()}
+
+# Saves the parts as an excel file (the file is only replaced once it has been completely written)
+def write_parts(path, parts):
+    def write(temp_path):
+        with zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            for name, data in parts.items():
+                zip_file.writestr(name, data)
+    replace_file(path, write)
+
+# Finds the part holding each sheet.  Returns the path of each sheet's XML, by the sheet's name.
+def sheet_paths(parts):
+    targets = {}
+    for relationship in ET.fromstring(parts['xl/_rels/workbook.xml.rels']).iter(f'{{{PACKAGE_NS}}}Relationship'):
+        target = relationship.get('Target')
+        targets[relationship.get('Id')] = target[1:] if target.startswith('/') else f'xl/{target}'
+
+    paths = {}
+    for sheet in ET.fromstring(parts['xl/workbook.xml']).iter(f'{{{MAIN_NS}}}sheet'):
+        paths[sheet.get('name')] = targets[sheet.get(f'{{{RELATIONSHIP_NS}}}id')]
+    return paths
+
+# Finds the styles (by number) whose cells hold dates
+def date_styles(parts):
+    styles = ET.fromstring(parts['xl/styles.xml'])
+    number_formats = dict(BUILTIN_FORMATS)
+    for number_format in styles.iter(f'{{{MAIN_NS}}}numFmt'):
+        number_formats[int(number_format.get('numFmtId'))] = number_format.get('formatCode')
+
+    styles = styles.find(f'{{{MAIN_NS}}}cellXfs')
+    return {i for i, style in enumerate(styles) if is_date_format(number_formats.get(int(style.get('numFmtId', 0))))}
+
+# Gets the number formats and cell styles of the workbook as XML (every row copied from one workbook into another
+# must use the same ones)
+def cell_styles(parts):
+    styles = parts['xl/styles.xml']
+    sections = []
+    for tag in (b'numFmts', b'cellXfs'):
+        start = styles.find(b'<' + tag)
+        sections.append(b'' if start < 0 else styles[start:styles.index(b'</' + tag + b'>', start)])
+    return tuple(sections)
+
+# Number of the last row of a sheet (1 if it only has its header)
+def last_row(xml):
+    start = xml.rfind(b'<row r="')
+    return int(ROW_PATTERN.match(xml, start).group(1)) if start >= 0 else 0
+
+# Position in a sheet's XML where a row starts (the end of the rows if the sheet does not have that many)
+def row_start(xml, row):
+    start = xml.find(b'<row r="%d"' % row)
+    return start if start >= 0 else xml.index(b'</sheetData>')
+
+# Reads the text of every shared string (workbooks saved by excel keep each text in one list instead of in its cells)
+def shared_strings(parts):
+    if 'xl/sharedStrings.xml' not in parts:
+        return []
+    return [''.join(text.text or '' for text in item.iter(f'{{{MAIN_NS}}}t'))
+            for item in ET.fromstring(parts['xl/sharedStrings.xml']).iter(f'{{{MAIN_NS}}}si')]
+
+# Reads the values of the rows from first_row to end_row (or the last row of the sheet), one list per row with
+# None for empty cells.  Dates are read as datetimes and whole numbers as ints, as they were written.
+def read_rows(xml, dates, strings, first_row=1, end_row=None):
+    end = xml.index(b'</sheetData>') if end_row is None else row_start(xml, end_row + 1)
+    rows_xml = xml[row_start(xml, first_row):end]
+    rows = []
+    for row in ET.fromstring(b'<sheetData xmlns="%s">%s</sheetData>' % (MAIN_NS.encode(), rows_xml)):
+        values = []
+        for cell in row:
+            column = column_index_from_string(COLUMN_PATTERN.match(cell.get('r')).group()) - 1
+            values.extend([None] * (column - len(values)))
+            values.append(cell_value(cell, dates, strings))
+        rows.append(values)
+    return rows
+
+# Converts a cell of a sheet's XML to its value
+def cell_value(cell, dates, strings):
+    kind = cell.get('t', 'n')
+    if kind == 'inlineStr':
+        return ''.join(text.text or '' for text in cell.iter(f'{{{MAIN_NS}}}t'))
+    value = cell.findtext(f'{{{MAIN_NS}}}v')
+    if value is None:
+        return None
+    if kind == 's':
+        return strings[int(value)]
+    if kind in ('str', 'e'):
+        return value
+    if kind == 'b':
+        return value == '1'
+    if int(cell.get('s', 0)) in dates:
+        return from_excel(float(value))
+    if value.lstrip('-').isdigit():
+        return int(value)
+    return float(value)
+
+# Gives the rows of a sheet's XML new numbers, moved down by the given number of rows
+def move_rows(rows_xml, moved_by):
+    rows_xml = ROW_PATTERN.sub(lambda match: b'<row r="%d"' % (int(match.group(1)) + moved_by), rows_xml)
+    return CELL_PATTERN.sub(lambda match: b'<c r="%s%d"' % (match.group(1), int(match.group(2)) + moved_by), rows_xml)
+
+# Joins a newly written sheet, whose rows go after the first kept_rows rows (below the header) of the same sheet
+# in an older workbook, with those rows.  The kept rows are copied byte for byte; only the new rows are renumbered.
+def splice_rows(old_xml, new_xml, kept_rows):
+    start = row_start(new_xml, 2)
+    end = new_xml.index(b'</sheetData>')
+    kept = old_xml[row_start(old_xml, 2):row_start(old_xml, kept_rows + 2)]
+    return new_xml[:start] + kept + move_rows(new_xml[start:end], kept_rows) + new_xml[end:]
+
+# A saved workbook, read one sheet at a time without openpyxl
+class SavedWorkbook:
+    # Constructor (source is the path of the excel file or a stream holding it)
+    def __init__(self, source):
+        self.parts = read_parts(source)
+        self.paths = sheet_paths(self.parts)
+        self.dates = date_styles(self.parts)
+        self.strings = shared_strings(self.parts)
+
+    # Gets the XML of a sheet
+    def sheet(self, name):
+        return self.parts[self.paths[name]]
+
+    # Number of the last row of a sheet
+    def last_row(self, name):
+        return last_row(self.sheet(name))
+
+    # Reads the values of the rows of a sheet from first_row to end_row (or its last row)
+    def rows(self, name, first_row=1, end_row=None):
+        return read_rows(self.sheet(name), self.dates, self.strings, first_row, end_row)